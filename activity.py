@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+import store
+from gains import group_columns
+
+# Trading days back used for OI/price changes and the volume average
+default_window = 5
+# Position build-up labels from the signs of the price and open interest changes
+buildup_labels = {
+    (1, 1): "Long build-up",
+    (-1, 1): "Short build-up",
+    (1, -1): "Short covering",
+    (-1, -1): "Long unwinding",
+}
+activity_columns = ['DATE', 'CLOSE_PRIC', 'PRICE_CHANGE_PCT', 'OI_NO_CON', 'OI_CHANGE', 'OI_CHANGE_PCT',
+                    'TRADED_QUA', 'VOLUME_AVG', 'VOLUME_SPIKE', 'BUILDUP']
+pcr_columns = ['TICKER', 'EXPIRY', 'DATE', 'CE_OI', 'PE_OI', 'PCR_OI', 'PCR_OI_CHANGE', 'CE_VOLUME', 'PE_VOLUME',
+               'PCR_VOLUME']
+rank_columns = {"oi": "OI_CHANGE", "volume": "VOLUME_SPIKE"}
+
+def sorted_groups(df, keys):
+    """Group rows by `keys` and sort them by group, then DATE.
+
+    Returns the group key frame, the row order, each sorted row's group
+    code and every group's [start, end) range in the sorted rows.
+    """
+    grouped = df.groupby(keys, observed=True, sort=True)
+    codes = grouped.ngroup().to_numpy()
+    order = np.lexsort((df['DATE'].to_numpy(), codes))
+    counts = np.bincount(codes, minlength=grouped.ngroups)
+    ends = np.cumsum(counts)
+    return grouped.size().index.to_frame(index=False), order, codes[order], ends - counts, ends
+
+def day_keys(codes, dates, window, calendar=None):
+    """Sort keys of (group, trading day) for rows sorted by group, then DATE.
+
+    Trading days are numbered over `calendar` (the store's trade dates,
+    see store.trading_dates) plus any other dates present, and groups are
+    spaced so that a key minus `window` never reaches another group. A
+    contract missing from the store on some days (e.g. its strike fell
+    below the underlying) thus keeps its lags on the trading-day grid,
+    however the rows were filtered before.
+    """
+    days = np.unique(dates) if calendar is None else np.union1d(np.asarray(calendar, dtype=dates.dtype), dates)
+    return codes.astype("int64") * (len(days) + window) + np.searchsorted(days, dates)
+
+def lagged_rows(keys, window):
+    """Index of the same group's row exactly `window` trading days back, or -1 when it has none that day."""
+    back = np.searchsorted(keys, keys - window)
+    found = back < len(keys)
+    found[found] = keys[back[found]] == keys[found] - window
+    return np.where(found, back, -1)
+
+def lagged(values, back):
+    """`values` at the lagged_rows positions, NaN where there is no lagged row."""
+    return np.where(back >= 0, values[back], np.nan)
+
+def prior_mean(values, keys, window):
+    """Mean of a group's recorded values over the previous `window` trading days (NaN when there are none)."""
+    rows = np.arange(len(keys))
+    first = np.searchsorted(keys, keys - window)
+    recorded = np.isfinite(values)
+    total = np.concatenate([[0.0], np.cumsum(np.where(recorded, values, 0.0))])
+    count = np.concatenate([[0], np.cumsum(recorded)])
+    count = count[rows] - count[first]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 0, (total[rows] - total[first]) / count, np.nan)
+
+def change_pct(now, before):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(before > 0, (now - before) / before * 100, np.nan)
+
+class ActivityPanel:
+    """Per-contract daily open interest and volume series with rolling changes.
+
+    Rows are sorted by contract, then DATE, once; each row's value
+    `window` trading days back (NaN when the contract has no row that
+    day) and the mean of the volumes recorded over the previous `window`
+    trading days (a cumulative sum differenced between sorted keys) are
+    then single array operations over the whole history. Works on the
+    options table (contracts keyed by `group_columns`) and on the futures
+    table (keyed by TICKER and EXPIRY). Pass the store's trade dates as
+    `calendar` when `df` is a filtered selection.
+    """
+
+    def __init__(self, df, keys=group_columns, window=default_window, calendar=None):
+        df = df.dropna(subset=keys + ['DATE'])
+        self.keys = keys
+        self.window = window
+        self.contracts, order, self.codes, _, self.ends = sorted_groups(df, keys)
+        self.date = df['DATE'].to_numpy()[order]
+        day = day_keys(self.codes, self.date, window, calendar)
+        back = lagged_rows(day, window)
+
+        self.close = store.restore_prices(df[['CLOSE_PRIC']], ['CLOSE_PRIC'])['CLOSE_PRIC'].to_numpy()[order]
+        self.oi = df['OI_NO_CON'].to_numpy(dtype="float64")[order]
+        self.volume = df['TRADED_QUA'].to_numpy(dtype="float64")[order]
+        close_back, oi_back = lagged(self.close, back), lagged(self.oi, back)
+        self.price_change_pct = change_pct(self.close, close_back)
+        self.oi_change = self.oi - oi_back
+        self.oi_change_pct = change_pct(self.oi, oi_back)
+        self.volume_avg = prior_mean(self.volume, day, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.volume_spike = np.where(self.volume_avg > 0, self.volume / self.volume_avg, np.nan)
+        price_sign = np.sign(np.nan_to_num(self.close - close_back))
+        oi_sign = np.sign(np.nan_to_num(self.oi_change))
+        self.buildup = np.select([(price_sign == price) & (oi_sign == oi) for price, oi in buildup_labels],
+                                 list(buildup_labels.values()), default="")
+
+    def frame(self, rows):
+        """Contract keys plus activity_columns for the given sorted row positions."""
+        df = self.contracts.iloc[self.codes[rows]].reset_index(drop=True)
+        values = [self.date, self.close, self.price_change_pct, self.oi, self.oi_change, self.oi_change_pct,
+                  self.volume, self.volume_avg, self.volume_spike, self.buildup]
+        for col, array in zip(activity_columns, values):
+            df[col] = array[rows]
+        return df
+
+    def series(self):
+        """Every contract's daily series, sorted by contract and DATE."""
+        return self.frame(np.arange(len(self.codes)))
+
+    def latest(self):
+        """Each contract's most recent row."""
+        return self.frame(self.ends - 1)
+
+def run_activity_scan(panel, rank="oi", top=None, min_volume=0):
+    """Rank the contracts trading on the latest date by OI build-up ("oi") or volume spike ("volume").
+
+    "oi" orders by the open interest added over the panel's window,
+    "volume" by the day's traded quantity over its rolling average.
+    Contracts whose volume is below `min_volume` are left out; RANK 1 is
+    the strongest.
+    """
+    df = panel.latest()
+    if df.empty:
+        return df.assign(RANK=pd.Series(dtype="int64"))
+    df = df[(df['DATE'] == df['DATE'].max()) & (df['TRADED_QUA'] >= min_volume)]
+    df = df.dropna(subset=[rank_columns[rank]]).sort_values(rank_columns[rank], ascending=False, kind='stable')
+    if top:
+        df = df.head(top)
+    return df.assign(RANK=np.arange(1, len(df) + 1)).reset_index(drop=True)
+
+def pcr_table(chain, window=default_window, calendar=None):
+    """Latest put/call OI and volume ratios per ticker and expiry, from the stored chain table.
+
+    PCR_OI_CHANGE is the change of PCR_OI over `window` trading days (NaN
+    when the chain has no row that day; `calendar` as for ActivityPanel). Only
+    expiries present on the latest date are returned.
+    """
+    if chain.empty:
+        return pd.DataFrame(columns=pcr_columns)
+    keys, order, codes, _, ends = sorted_groups(chain, ['TICKER', 'EXPIRY'])
+    chain = chain.iloc[order].reset_index(drop=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pcr_oi = np.where(chain['CE_OI'] > 0, chain['PE_OI'] / chain['CE_OI'], np.nan)
+        chain['PCR_VOLUME'] = np.where(chain['CE_VOLUME'] > 0, chain['PE_VOLUME'] / chain['CE_VOLUME'], np.nan)
+    back = lagged_rows(day_keys(codes, chain['DATE'].to_numpy(), window, calendar), window)
+    chain['PCR_OI'] = pcr_oi
+    chain['PCR_OI_CHANGE'] = pcr_oi - lagged(pcr_oi, back)
+    latest = chain.iloc[ends - 1]
+    return latest[latest['DATE'] == latest['DATE'].max()][pcr_columns].reset_index(drop=True)
+
+def run_pcr_scan(chain, window=default_window, top=None, min_oi=0, calendar=None):
+    """pcr_table ranked by PCR_OI (highest first), leaving out chains with less than `min_oi` total open interest."""
+    df = pcr_table(chain, window, calendar)
+    df = df[df['CE_OI'] + df['PE_OI'] >= min_oi].dropna(subset=['PCR_OI'])
+    df = df.sort_values('PCR_OI', ascending=False, kind='stable')
+    if top:
+        df = df.head(top)
+    return df.assign(RANK=np.arange(1, len(df) + 1)).reset_index(drop=True)
@@ -0,0 +1,226 @@
+"""Benchmarks for the ingest -> scan pipeline on synthetic bhavcopies.
+
+A scale multiplies the trading days of synth.default_config (about the
+volume zip/ holds today), so 10 is ten months of history and 100 is about
+ten years. Archives for each scale are generated once under bench/ and
+reused; every stage then runs against a scratch store:
+
+    ingest      process_data over all the archives (full rebuild)
+    load        load_options + FilterIndex, what the dashboard does for a new data version
+    filter      FilterIndex.select over random sidebar selections
+    gains       GainPanel for all 30 windows plus every panel.gains(days) table
+    underlying  underlying_table + get_recent_or_1day_undrlng_st over every row
+
+Each stage records its best wall time over --repeat runs, rows/sec, and the
+peak memory of a separate traced run (Python and NumPy allocations via
+tracemalloc, plus the process's max RSS so far). Results are written as
+JSON named after the git commit, so two commits can be compared:
+
+    python benchmark.py --scales 1 10 100
+    python benchmark.py --compare bench/results/<old>.json bench/results/<new>.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import store
+import synth
+from filters import FilterIndex
+from gains import GainPanel
+from ingest import process_data
+from underlying import get_recent_or_1day_undrlng_st, underlying_table
+
+bench_dir = "bench"
+results_dir = os.path.join(bench_dir, "results")
+stages = ["ingest", "load", "filter", "gains", "underlying"]
+
+def git_revision():
+    """Short commit hash of the working tree, with a -dirty suffix when it has local changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+def archives_for(scale, config):
+    """Generate (or reuse) the archives of one scale; returns their directory."""
+    config = dict(config, days=max(1, round(config["days"] * scale)))
+    directory = os.path.join(bench_dir, f"scale-{scale:g}", "zip")
+    config_path = os.path.join(directory, "synth.json")
+    if os.path.exists(config_path):
+        with open(config_path) as f:
+            if json.load(f) == config:
+                return directory, config
+    shutil.rmtree(directory, ignore_errors=True)
+    synth.generate(directory, **config)
+    with open(config_path, "w") as f:
+        json.dump(config, f, indent=2, sort_keys=True)
+    return directory, config
+
+def measure(run, repeat=3, memory=True):
+    """Best wall time of `repeat` calls to `run()` (which returns a row count), plus one traced call for memory."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = run()
+        times.append(time.perf_counter() - start)
+    result = {"seconds": min(times), "runs": times, "rows": rows,
+              "rows_per_sec": rows / min(times) if min(times) else None}
+    if memory:
+        tracemalloc.start()
+        run()
+        result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        if resource is not None:
+            result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+    return result
+
+def random_selections(index, count, seed=0):
+    """`count` sidebar selections (ticker, expiry, type, strike, option type) drawn like a user would."""
+    rng = np.random.default_rng(seed)
+    tickers = index.options()['TICKER']
+    selections = []
+    for _ in range(count):
+        ticker = tickers[rng.integers(len(tickers))] if rng.random() < 0.8 else "All"
+        expiries = index.options(ticker)['EXPIRY']
+        expiry = expiries[rng.integers(len(expiries))] if rng.random() < 0.5 else "All"
+        type_filter = ["All", "CE", "PE"][rng.integers(3)]
+        strikes = index.options(ticker, expiry, type_filter)['STRIKE PRICE']
+        strike = strikes[rng.integers(len(strikes))] if strikes and rng.random() < 0.3 else "All"
+        selections.append((ticker, expiry, type_filter, strike, "All"))
+    return selections
+
+def run_scale(scale, config, repeat=3, workers=1, memory=True, selections=50):
+    """Time every stage at one scale and return {"config", "archives", "stages"}."""
+    zip_dir, config = archives_for(scale, config)
+    store.use_directory(os.path.join(bench_dir, f"scale-{scale:g}", "output"))
+    archives = sum(name.endswith(".zip") for name in os.listdir(zip_dir))
+    results = {"config": config, "archives": archives, "stages": {}}
+
+    def ingest():
+        process_data(workers=workers, full=True, source_dirs=[zip_dir])
+        return sum(entry["rows"] for entry in store.load_manifest()["archives"].values())
+    results["stages"]["ingest"] = measure(ingest, repeat, memory)
+
+    state = {}
+    def load():
+        df = store.load_options(columns=store.dashboard_columns)
+        state["index"] = FilterIndex(df.dropna(subset=['LOW_PRICE', 'HIGH_PRICE', 'CLOSE_PRIC', 'OPEN_PRICE',
+                                                       'DATE']))
+        return len(df)
+    results["stages"]["load"] = measure(load, repeat, memory)
+    index = state["index"]
+    df = index.df
+
+    chosen = random_selections(index, selections)
+    def select():
+        for selection in chosen:
+            index.select(*selection)
+        return len(df) * len(chosen)
+    results["stages"]["filter"] = measure(select, repeat, memory)
+
+    def gains():
+        panel = GainPanel(df)
+        for days in range(1, panel.window + 1):
+            panel.gains(days)
+        return len(df)
+    results["stages"]["gains"] = measure(gains, repeat, memory)
+
+    def resolve():
+        get_recent_or_1day_undrlng_st(df, underlying_table(store.load_underlying()))
+        return len(df)
+    results["stages"]["underlying"] = measure(resolve, repeat, memory)
+    return results
+
+def run(scales, config, repeat=3, workers=1, memory=True, output=None):
+    """Benchmark every scale, print a summary and write the JSON report; returns its path."""
+    report = {
+        "revision": git_revision(),
+        "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "versions": {"pandas": pd.__version__, "numpy": np.__version__, "pyarrow": pa.__version__},
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "repeat": repeat,
+        "workers": workers,
+        "scales": {},
+    }
+    for scale in scales:
+        result = run_scale(scale, config, repeat, workers, memory)
+        report["scales"][f"{scale:g}"] = result
+        for stage in stages:
+            numbers = result["stages"][stage]
+            memory_text = f"  peak {numbers['peak_mb']:8.1f} MB" if "peak_mb" in numbers else ""
+            print(f"{scale:>6g}x {stage:<10} {numbers['seconds']:9.3f} s  "
+                  f"{numbers['rows_per_sec'] or 0:14,.0f} rows/s{memory_text}")
+
+    output = output or os.path.join(results_dir, report["revision"] + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return output
+
+def compare(old_path, new_path):
+    """Print new/old ratios of wall time and peak memory for every scale and stage both reports have."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['revision']} -> {new['revision']}  (ratio < 1 is faster / smaller)")
+    for scale, result in new["scales"].items():
+        if scale not in old["scales"]:
+            continue
+        for stage in stages:
+            before = old["scales"][scale]["stages"].get(stage)
+            after = result["stages"].get(stage)
+            if not before or not after:
+                continue
+            line = (f"{scale:>6}x {stage:<10} {before['seconds']:9.3f} s -> {after['seconds']:9.3f} s "
+                    f"({after['seconds'] / before['seconds']:5.2f}x)")
+            if before.get("peak_mb") and after.get("peak_mb"):
+                line += f"  peak {after['peak_mb'] / before['peak_mb']:5.2f}x"
+            print(line)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingestion and scans on synthetic bhavcopies.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100],
+                        help="multiples of today's volume (trading days of synth.default_config)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (the best is kept)")
+    parser.add_argument("--workers", type=int, default=1, help="ingestion worker processes")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run used for peak memory")
+    parser.add_argument("--output", default=None, help="report path (default: bench/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two reports and exit")
+    for name in ("tickers", "expiries", "strikes", "seed"):
+        parser.add_argument(f"--{name}", type=int, default=synth.default_config[name])
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return 0
+    config = dict(synth.default_config, tickers=args.tickers, expiries=args.expiries, strikes=args.strikes,
+                  seed=args.seed)
+    run(args.scales, config, args.repeat, args.workers, not args.no_memory, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
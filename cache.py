@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """Thread-safe bounded LRU cache that counts hits, misses and evictions."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Return the cached value for `key`, calling `compute()` and storing the result on a miss."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        value = compute()
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Hit/miss/eviction counters and the current size."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+class SharedCache:
+    """Caches shared by every dashboard session, keyed on the store's data version.
+
+    `data` holds what is loaded once per version (the cleaned frame, sidebar
+    option lists, the underlying table); `results` is a bounded LRU of
+    computed tables keyed on the filter tuple. Calling `sync` with a new
+    version drops everything cached for the old one.
+    """
+
+    def __init__(self, max_results=64):
+        self.version = None
+        self.data = LRUCache(max_entries=8)
+        self.results = LRUCache(max_entries=max_results)
+        self.lock = threading.Lock()
+
+    def sync(self, version):
+        """Invalidate every cache when the data version changed since the last call."""
+        with self.lock:
+            if version != self.version:
+                self.data.clear()
+                self.results.clear()
+                self.version = version
+
+    def stats(self):
+        """Counters of both caches, keyed by cache name."""
+        return {"data": self.data.stats(), "results": self.results.stats()}
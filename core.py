@@ -1,296 +1,393 @@
-import os
+import numpy as np
 import pandas as pd
-import re
-import zipfile
-import shutil
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 
-# Define directories
-source_dir = "zip"
-destination_dir = "output"
-pattern = re.compile(r"^(OPTSTK|OPTIDX)([A-Z]+)(\d{2}-[A-Z]{3}-\d{4})(CE|PE)([\d\.]+)$")
-
-# Ensure source_dir exists
-if not os.path.exists(source_dir):
-    os.makedirs(source_dir)
-
-# Function from bhav.py to extract date
-def extract_date(folder_name):
-    """Extract date from folder or zip name and return formatted date (DD-MMM-YYYY)."""
-    match = re.search(r"(\d{2})(\d{2})(\d{2})$", folder_name.split(".")[0])
-    if match:
-        day, month, year = match.groups()
-        year = "20" + year if int(year) <= 50 else "19" + year
-        month_names = {
-            "01": "JAN", "02": "FEB", "03": "MAR", "04": "APR", "05": "MAY", "06": "JUN",
-            "07": "JUL", "08": "AUG", "09": "SEP", "10": "OCT", "11": "NOV", "12": "DEC"
-        }
-        month = month_names.get(month, month)
-        formatted_date = f"{day}-{month}-{year}"
-        return formatted_date
-    return ""
-
-# Function to process data (bhav.py logic)
-def process_data():
-    merged_data = []
-    for item in os.listdir(source_dir):
-        item_path = os.path.join(source_dir, item)
-
-        if item.endswith(".zip") and item.startswith("fo"):
-            formatted_date = extract_date(item.split(".")[0])
-            extract_path = os.path.join(source_dir, item[:-4])
-            
-            with zipfile.ZipFile(item_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_path)
-
-            for file in os.listdir(extract_path):
-                if file.startswith("op") and file.endswith(".csv"):
-                    file_path = os.path.join(extract_path, file)
-                    df = pd.read_csv(file_path)
-
-                    if df.shape[1] < 14:
-                        continue
-
-                    df.drop(df.iloc[:, 6:11], axis=1, inplace=True)
-                    df.drop(df.iloc[:, 7:9], axis=1, inplace=True)
-
-                    if "PREVIOUS_S" in df.columns:
-                        previous_s_index = df.columns.get_loc("PREVIOUS_S")
-                        new_columns = ["Option Type", "TICKER", "EXPIRY", "TYPE", "STRIKE PRICE"]
-                        for idx, col_name in enumerate(new_columns):
-                            df.insert(previous_s_index + idx, col_name, "")
-
-                        for i, row in df.iterrows():
-                            match = pattern.match(str(row.iloc[0]))
-                            if match:
-                                df.at[i, "Option Type"] = match.group(1)
-                                df.at[i, "TICKER"] = match.group(2)
-                                df.at[i, "EXPIRY"] = match.group(3)
-                                df.at[i, "TYPE"] = match.group(4)
-                                df.at[i, "STRIKE PRICE"] = match.group(5)
-
-                    df["DATE"] = formatted_date
-                    if "CLOSE_PRIC" in df.columns:
-                        df["CLOSE_PRIC"] = df["CLOSE_PRIC"].replace(0, 0.05)
-
-                    df["STRIKE PRICE"] = pd.to_numeric(df["STRIKE PRICE"], errors='coerce')
-                    df["UNDRLNG_ST"] = pd.to_numeric(df.get("UNDRLNG_ST", pd.Series()), errors='coerce')
-
-                    if "UNDRLNG_ST" in df.columns:
-                        df = df[df["STRIKE PRICE"] > df["UNDRLNG_ST"]].dropna(subset=["STRIKE PRICE", "UNDRLNG_ST"])
-
-                    if not df.empty:
-                        merged_data.append(df)
-
-            shutil.rmtree(extract_path)
-
-        elif os.path.isdir(item_path) and item.startswith("fo"):
-            formatted_date = extract_date(item.split(".")[0])
-
-            for file in os.listdir(item_path):
-                if file.startswith("op") and file.endswith(".csv"):
-                    file_path = os.path.join(item_path, file)
-                    df = pd.read_csv(file_path)
-
-                    if df.shape[1] < 14:
-                        continue
-
-                    df.drop(df.iloc[:, 6:14], axis=1, inplace=True)
-
-                    if "PREVIOUS_S" in df.columns:
-                        previous_s_index = df.columns.get_loc("PREVIOUS_S")
-                        new_columns = ["Option Type", "TICKER", "EXPIRY", "TYPE", "STRIKE PRICE"]
-                        for idx, col_name in enumerate(new_columns):
-                            df.insert(previous_s_index + idx, col_name, "")
-
-                        for i, row in df.iterrows():
-                            match = pattern.match(str(row.iloc[0]))
-                            if match:
-                                df.at[i, "Option Type"] = match.group(1)
-                                df.at[i, "TICKER"] = match.group(2)
-                                df.at[i, "EXPIRY"] = match.group(3)
-                                df.at[i, "TYPE"] = match.group(4)
-                                df.at[i, "STRIKE PRICE"] = match.group(5)
-
-                    df["DATE"] = formatted_date
-                    if "CLOSE_PRIC" in df.columns:
-                        df["CLOSE_PRIC"] = df["CLOSE_PRIC"].replace(0, 0.05)
-
-                    df["STRIKE PRICE"] = pd.to_numeric(df["STRIKE PRICE"], errors='coerce')
-                    df["UNDRLNG_ST"] = pd.to_numeric(df.get("UNDRLNG_ST", pd.Series()), errors='coerce')
-
-                    if "UNDRLNG_ST" in df.columns:
-                        df = df[df["STRIKE PRICE"] > df["UNDRLNG_ST"]].dropna(subset=["STRIKE PRICE", "UNDRLNG_ST"])
-
-                    if not df.empty:
-                        merged_data.append(df)
-
-    if merged_data:
-        final_df = pd.concat(merged_data, ignore_index=True)
-        final_output_path = os.path.join(destination_dir, "merge.csv")
-        final_df.to_csv(final_output_path, index=False)
-        return True, f"Processed CSV saved at: {final_output_path}"
-    return False, "No valid CSV files found for processing."
+import diagnostics
+import store
+from activity import ActivityPanel, default_window, pcr_columns, run_activity_scan, run_pcr_scan
+from cache import SharedCache
+from diagnostics import Trace
+from filters import FilterIndex
+from gains import GainPanel, group_columns
+from greeks import greek_mask
+from underlying import get_recent_or_1day_undrlng_st, underlying_table
+from worker import IngestWorker, upload_dir, save_upload
+
+# Columns of the results table
+result_columns = ['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE', 'DISPLAY_UNDRLNG_ST', 'CLOSE_PRIC', 'LOW_PRICE',
+                  'GAIN_PERCENT', 'IV', 'DELTA']
+max_iv = 300.0
+# Sidebar scan modes: the gain scan, or a ranking of the latest day (activity.py)
+scan_modes = {"Gains": None, "OI Build-up": "oi", "Volume Spike": "volume", "Put/Call Ratio": "pcr"}
+# Bounds on what one rerun sends to the browser, however loose the filters are
+page_sizes = [25, 50, 100, 250]
+max_chart_bars = 100
+max_candles = 250
+max_chart_points = 4000
+chart_modes = ["Best contract per ticker", "Top contracts"]
+activity_result_columns = ['RANK', 'TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE', 'CLOSE_PRIC', 'PRICE_CHANGE_PCT',
+                           'OI_NO_CON', 'OI_CHANGE', 'OI_CHANGE_PCT', 'TRADED_QUA', 'VOLUME_AVG', 'VOLUME_SPIKE',
+                           'BUILDUP']
+
+def format_expiry(expiry):
+    """Show expiry dates as DD-MMM-YYYY in the sidebar."""
+    return expiry if expiry == "All" else pd.Timestamp(expiry).strftime('%d-%b-%Y').upper()
+
+# Caching shared by every session, keyed on the store's data version
+@st.cache_resource
+def shared_cache():
+    """One SharedCache per server process."""
+    return SharedCache()
+
+@st.cache_resource
+def ingest_worker():
+    """The background ingestion worker, one per server process, started on first use."""
+    return IngestWorker().start()
+
+@st.fragment(run_every=2)
+def show_ingest_status(worker):
+    """Live ingestion progress; reruns the app once a newer data version has been published.
+
+    The version is read from the store, not the worker, since scan.py or fetch.py may have published it.
+    """
+    status = worker.status()
+    version = store.data_version()
+    if status["state"] == "ingesting":
+        st.progress(status["done"] / max(status["total"], 1),
+                    text=f"Ingesting {status['done']}/{status['total']} archive(s)")
+    else:
+        st.caption(f"Ingestion {status['state']}, {status['queue']} archive(s) queued, data version {version}")
+    if status["error"]:
+        st.error(status["error"])
+    if status["failed"]:
+        st.warning(f"Skipped unreadable archive(s): {', '.join(status['failed'])}")
+    if version != st.session_state.get("data_version", version):
+        st.rerun()
+
+def load_filter_index(cache, version):
+    """FilterIndex over the cleaned dashboard frame for `version`, built once and shared read-only by all sessions."""
+    def load():
+        df = store.load_options(columns=store.dashboard_columns)
+        return FilterIndex(df.dropna(subset=['LOW_PRICE', 'HIGH_PRICE', 'CLOSE_PRIC', 'OPEN_PRICE', 'DATE']))
+    return cache.data.get(("index", version), load)
+
+def select_filters(index, sidebar):
+    """Sidebar filter widgets whose option lists cascade from ticker to expiry, type and strike."""
+    ticker = sidebar.selectbox("Select Ticker", ["All"] + index.options()['TICKER'])
+    expiry = sidebar.selectbox("Select Expiry Date", ["All"] + index.options(ticker)['EXPIRY'], format_func=format_expiry)
+    type_filter = sidebar.selectbox("Select CE/PE Type", ["All"] + index.options(ticker, expiry)['TYPE'])
+    strike_price = sidebar.selectbox("Select Strike Price", ["All"] + index.options(ticker, expiry, type_filter)['STRIKE PRICE'])
+    option_type = sidebar.selectbox("Select Option Type", ["All", "OPTSTK", "OPTIDX"])
+    return ticker, expiry, type_filter, strike_price, option_type
+
+def select_greek_filters(sidebar):
+    """IV % and |Delta| range sliders; a slider left at its full range returns None (no filter, NaN rows kept)."""
+    iv_range = sidebar.slider("IV % Range", min_value=0.0, max_value=max_iv, value=(0.0, max_iv), step=5.0)
+    delta_range = sidebar.slider("|Delta| Range", min_value=0.0, max_value=1.0, value=(0.0, 1.0), step=0.05)
+    if iv_range == (0.0, max_iv):
+        iv_range = None
+    elif iv_range[1] == max_iv:
+        iv_range = (iv_range[0], float("inf"))
+    return iv_range, (None if delta_range == (0.0, 1.0) else delta_range)
+
+def load_scan(cache, version, index, filters):
+    """Filtered rows, gain panel and underlying table for one filter tuple, kept in the results LRU.
+
+    Changing only the Day Range is then a lookup into the cached panel.
+    """
+    def compute():
+        df_filtered = index.select(*filters)
+        table = cache.data.get(("underlying", version), lambda: underlying_table(store.load_underlying()))
+        return df_filtered, GainPanel(df_filtered), get_recent_or_1day_undrlng_st(df_filtered, table)
+    return cache.results.get(("scan", version, filters), compute)
+
+def load_activity(cache, version, index, filters, window):
+    """ActivityPanel over the filtered rows for one (filter tuple, window), kept in the results LRU."""
+    return cache.results.get(("activity", version, filters, window),
+                             lambda: ActivityPanel(index.select(*filters), ['Option Type'] + group_columns, window,
+                                                   store.trading_dates()))
+
+def load_pcr(cache, version, ticker, expiry, window):
+    """Ranked put/call ratios of the chain table for one ticker/expiry selection, kept in the results LRU."""
+    def compute():
+        chain = cache.data.get(("chain", version), store.load_chain)
+        if ticker != "All":
+            chain = chain[chain['TICKER'] == ticker]
+        if expiry != "All":
+            chain = chain[chain['EXPIRY'] == expiry]
+        return run_pcr_scan(chain, window, calendar=store.trading_dates())
+    return cache.results.get(("pcr", version, ticker, expiry, window), compute)
+
+def render_activity(mode, cache, version, index, filters, trace):
+    """OI build-up, volume spike or put/call ratio ranking of the latest day, for the sidebar selection."""
+    window = st.sidebar.slider("Rolling Window (days)", min_value=1, max_value=30, value=default_window)
+    minimum = st.sidebar.number_input("Minimum Open Interest" if mode == "pcr" else "Minimum Volume",
+                                      min_value=0, value=0, step=1000)
+    top = st.sidebar.number_input("Show Top", min_value=1, max_value=1000, value=50)
+
+    with trace.stage("activity", rows_in=len(index.df)) as record:
+        if mode == "pcr":
+            df = load_pcr(cache, version, filters[0], filters[1], window)
+            df = df[df['CE_OI'] + df['PE_OI'] >= minimum]
+            columns, value, color = ['RANK'] + pcr_columns, 'PCR_OI', 'EXPIRY'
+        else:
+            df = run_activity_scan(load_activity(cache, version, index, filters, window), mode, None, minimum)
+            columns, value, color = activity_result_columns, ('OI_CHANGE' if mode == "oi" else 'VOLUME_SPIKE'), 'BUILDUP'
+        df = df.head(int(top)).assign(RANK=lambda frame: range(1, len(frame) + 1))
+        record["rows_out"] = len(df)
+
+    with trace.stage("table", rows_in=len(df)):
+        st.dataframe(df[columns], hide_index=True)
+
+    with trace.stage("chart", rows_in=len(df)):
+        fig = px.bar(
+            df.head(25).astype({'EXPIRY': str}),
+            x='TICKER',
+            y=value,
+            color=color,
+            title=f"Top {min(len(df), 25)} by {value}",
+            hover_data=[col for col in ('EXPIRY', 'TYPE', 'STRIKE PRICE') if col in df.columns]
+        )
+        st.plotly_chart(fig)
+
+def sort_page(df, column, ascending, page, page_size):
+    """One page (1-based, clamped to the last page) of `df` sorted by `column` with NaN last; returns (rows, page, pages)."""
+    pages = max(1, -(-len(df) // page_size))
+    page = min(max(int(page), 1), pages)
+    ordered = df.sort_values(column, ascending=ascending, na_position='last', kind='stable')
+    return ordered.iloc[(page - 1) * page_size:page * page_size], page, pages
+
+def show_results_table(df, columns, key="results", sort_column='GAIN_PERCENT'):
+    """Results table sorted and paginated on the server, so only one page is sent to the browser."""
+    controls = st.columns(4)
+    column = controls[0].selectbox("Sort by", columns, index=columns.index(sort_column), key=f"{key}_sort")
+    ascending = controls[1].selectbox("Order", ["Descending", "Ascending"], key=f"{key}_order") == "Ascending"
+    page_size = controls[2].selectbox("Rows per page", page_sizes, key=f"{key}_page_size")
+    requested = controls[3].number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+    rows, page, pages = sort_page(df, column, ascending, requested, page_size)
+    first = (page - 1) * page_size
+    st.caption(f"Rows {min(first + 1, len(df))}-{first + len(rows)} of {len(df)} (page {page} of {pages})")
+    st.dataframe(rows[columns], hide_index=True)
+
+def top_gains(df, mode, bars):
+    """At most `bars` rows for the gain chart: the best contract of each ticker, or the top contracts overall."""
+    ranked = df.sort_values('GAIN_PERCENT', ascending=False, kind='stable')
+    if mode == chart_modes[0]:
+        ranked = ranked.drop_duplicates('TICKER')
+    return ranked.head(bars)
+
+def show_gain_chart(df, key="gains"):
+    """Bar chart of the top-N filtered options by gain, one bar per ticker or per contract."""
+    controls = st.columns(2)
+    mode = controls[0].selectbox("Chart", chart_modes, key=f"{key}_chart")
+    bars = controls[1].slider("Bars", min_value=5, max_value=max_chart_bars, value=25, key=f"{key}_bars")
+    top = top_gains(df, mode, bars).astype({'TICKER': str, 'EXPIRY': str, 'TYPE': str})
+    if mode == chart_modes[0]:
+        x = 'TICKER'
+    else:
+        x = 'CONTRACT'
+        top[x] = top['TICKER'] + " " + top['STRIKE PRICE'].map('{:g}'.format) + top['TYPE'] + " " + top['EXPIRY'].str[:10]
+    fig = px.bar(
+        top,
+        x=x,
+        y='GAIN_PERCENT',
+        color='TYPE',
+        title=f"Top {len(top)} of {len(df)} Filtered Options by Gain",
+        hover_data=['EXPIRY', 'STRIKE PRICE', 'DISPLAY_UNDRLNG_ST'],
+        category_orders={x: list(top[x])}
+    )
+    st.plotly_chart(fig)
+
+def downsample_ohlc(df, max_points=max_chart_points):
+    """Merge consecutive rows into at most `max_points` OHLC buckets (first open, highest high, lowest low, last close)."""
+    if len(df) <= max_points:
+        return df
+    grouped = df.groupby(np.arange(len(df)) * max_points // len(df))
+    return pd.DataFrame({
+        'DATE': grouped['DATE'].first(),
+        'OPEN_PRICE': grouped['OPEN_PRICE'].first(),
+        'HIGH_PRICE': grouped['HIGH_PRICE'].max(),
+        'LOW_PRICE': grouped['LOW_PRICE'].min(),
+        'CLOSE_PRIC': grouped['CLOSE_PRIC'].last(),
+    })
+
+def price_chart(df):
+    """Candlesticks for up to `max_candles` rows; beyond that a WebGL low-high band and close line, downsampled."""
+    df = df.sort_values('DATE', kind='stable')
+    if len(df) <= max_candles:
+        return go.Figure(data=[go.Candlestick(
+            x=df['DATE'],
+            open=df['OPEN_PRICE'],
+            high=df['HIGH_PRICE'],
+            low=df['LOW_PRICE'],
+            close=df['CLOSE_PRIC']
+        )])
+    df = downsample_ohlc(df)
+    return go.Figure(data=[
+        go.Scattergl(x=df['DATE'], y=df['HIGH_PRICE'], mode='lines', line={'width': 0}, showlegend=False,
+                     name='High'),
+        go.Scattergl(x=df['DATE'], y=df['LOW_PRICE'], mode='lines', line={'width': 0}, fill='tonexty',
+                     name='Low-High'),
+        go.Scattergl(x=df['DATE'], y=df['CLOSE_PRIC'], mode='lines', name='Close'),
+    ])
+
+def show_cache_stats(cache):
+    """Sidebar panel with the shared cache's hit rates."""
+    with st.sidebar.expander("Cache statistics"):
+        for name, stats in cache.stats().items():
+            st.write(f"**{name}**: {stats['hit_rate']:.0%} hit rate "
+                     f"({stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions, "
+                     f"{stats['entries']}/{stats['max_entries']} entries)")
+
+def show_diagnostics(trace):
+    """Optional sidebar panel: stage timings of this rerun and the last ingestion, and the rerun profiler."""
+    if not st.sidebar.checkbox("Show diagnostics", value=False):
+        return
+    with st.sidebar.expander("Diagnostics", expanded=True):
+        st.caption(f"This rerun ({trace.run}), also logged to {diagnostics.log_path()}")
+        st.dataframe(pd.DataFrame(trace.summary()), hide_index=True)
+        if "ingest_trace" in st.session_state:
+            st.caption("Last ingestion run")
+            st.dataframe(pd.DataFrame(st.session_state["ingest_trace"]), hide_index=True)
+        if st.button("Profile next rerun"):
+            st.session_state["profile_next_run"] = True
+            st.rerun()
+        if "last_profile" in st.session_state:
+            st.caption(f"Profile saved to {st.session_state['last_profile']['path']}")
+            st.code(st.session_state["last_profile"]["stats"])
 
 # Streamlit App (app.py logic)
 def run_dashboard():
-    # Load dataset
-    file_path = os.path.join(destination_dir, "merge.csv")
-    
-    # File uploader for ZIP files
+    """Render the dashboard, timing each stage and profiling the rerun when requested."""
+    trace = Trace("dashboard")
+    if st.session_state.pop("profile_next_run", False):
+        with diagnostics.profiled("dashboard") as profile:
+            render_dashboard(trace)
+        st.session_state["last_profile"] = profile
+    else:
+        render_dashboard(trace)
+    trace.write()
+    show_diagnostics(trace)
+
+def render_dashboard(trace):
+    worker = ingest_worker()
+
+    # File uploader for ZIP files; each file is handed to the worker once, not on every rerun
     st.sidebar.header("Upload ZIP Files")
     uploaded_files = st.sidebar.file_uploader("Upload ZIP files", type=["zip"], accept_multiple_files=True)
-    
-    if uploaded_files:
-        for uploaded_file in uploaded_files:
-            # Save uploaded ZIP file to source_dir
-            zip_path = os.path.join(source_dir, uploaded_file.name)
-            with open(zip_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            st.sidebar.success(f"Saved {uploaded_file.name} to {source_dir}")
-
-    # Process Data Button
+    saved = st.session_state.setdefault("saved_uploads", set())
+    new_files = [uploaded_file for uploaded_file in uploaded_files or [] if uploaded_file.file_id not in saved]
+    if new_files:
+        with trace.stage("upload", rows_in=len(new_files)):
+            for uploaded_file in new_files:
+                save_upload(uploaded_file.name, uploaded_file.getbuffer())
+                saved.add(uploaded_file.file_id)
+                st.sidebar.success(f"Queued {uploaded_file.name} from {upload_dir}")
+            worker.request()
+
+    # Process Data Button: ingestion runs in the background worker, this session keeps the current data
     if st.button("Process Data"):
-        with st.spinner("Processing data..."):
-            success, message = process_data()
-            if success:
-                st.success(message)
-            else:
-                st.error(message)
-
-    # Check if merge.csv exists
-    if not os.path.exists(file_path):
-        st.warning("merge.csv not found. Please upload ZIP files and process data first.")
+        worker.request()
+        st.info("Ingestion requested; the dashboard switches to the new data once it is published.")
+    status = worker.status()
+    if status["trace"]:
+        st.session_state["ingest_trace"] = status["trace"]
+
+    # CSV export for anyone who still wants merge.csv
+    if st.sidebar.button("Export merge.csv"):
+        success, message = store.export_csv()
+        if success:
+            st.sidebar.success(message)
+        else:
+            st.sidebar.error(message)
+
+    # Load typed columns from the partitioned store (shared across sessions per data version)
+    with trace.stage("load_index") as record:
+        cache = shared_cache()
+        version = store.data_version()
+        st.session_state["data_version"] = version
+        cache.sync(version)
+        index = load_filter_index(cache, version)
+        record["rows_out"] = len(index.df)
+    with st.sidebar:
+        show_ingest_status(worker)
+    if index.df.empty:
+        st.warning("No processed data found. Please upload ZIP files and process data first.")
         return
 
-    df = pd.read_csv(file_path)
-
-    # Clean and Prepare Data
-    df = df.dropna(subset=['LOW_PRICE', 'HIGH_PRICE', 'CLOSE_PRIC', 'OPEN_PRICE', 'DATE'])
-    df['CLOSE_PRIC'] = pd.to_numeric(df['CLOSE_PRIC'], errors='coerce')
-    df['OPEN_PRICE'] = pd.to_numeric(df['OPEN_PRICE'], errors='coerce')
-    df['LOW_PRICE'] = pd.to_numeric(df['LOW_PRICE'], errors='coerce')
-    df['HIGH_PRICE'] = pd.to_numeric(df['HIGH_PRICE'], errors='coerce')
-    df['DATE'] = pd.to_datetime(df['DATE'], format='%d-%b-%Y', errors='coerce')
-
     # Streamlit UI
     st.title("📈 Options Price Gain Tracker")
 
     # Sidebar Filters
-    ticker = st.sidebar.selectbox("Select Ticker", ["All"] + list(df['TICKER'].unique()))
-    expiry = st.sidebar.selectbox("Select Expiry Date", ["All"] + list(df['EXPIRY'].unique()))
-    type_filter = st.sidebar.selectbox("Select CE/PE Type", ["All"] + list(df['TYPE'].unique()))
-    strike_price = st.sidebar.selectbox("Select Strike Price", ["All"] + list(df['STRIKE PRICE'].unique()))
-    option_type = st.sidebar.selectbox("Select Option Type", ["All", "OPTSTK", "OPTIDX"])
-    gain_threshold = st.sidebar.slider("Gain % Threshold", min_value=1, max_value=3000, value=10, step=50)
-    strike_greater_than_undrlng = st.sidebar.checkbox("Show only Strike Price > Underlying Value", value=False)
-
-    days_option = st.sidebar.selectbox("Select Day Range", ["1 Day", "2 Days", "3 Days", "Custom"])
-    if days_option == "Custom":
-        custom_days = st.sidebar.number_input("Enter Custom Days", min_value=1, max_value=30, value=5)
-        days = custom_days
-    else:
-        days = int(days_option.split()[0])
-
-    # Apply Filters
-    df_filtered = df.copy()
-    if ticker != "All":
-        df_filtered = df_filtered[df_filtered['TICKER'] == ticker]
-    if expiry != "All":
-        df_filtered = df_filtered[df_filtered['EXPIRY'] == expiry]
-    if type_filter != "All":
-        df_filtered = df_filtered[df_filtered['TYPE'] == type_filter]
-    if strike_price != "All":
-        df_filtered = df_filtered[df_filtered['STRIKE PRICE'] == strike_price]
-    if option_type != "All":
-        df_filtered = df_filtered[df_filtered['Option Type'].fillna("").str.upper() == option_type]
-
-    # Function to Get the Most Recent or 1-Day Old `UNDRLNG_ST`
-    def get_recent_or_1day_undrlng_st(df):
-        df = df.sort_values(['TICKER', 'STRIKE PRICE', 'DATE'], ascending=[True, True, False])
-        final_data = []
-        for (ticker, strike), group in df.groupby(['TICKER', 'STRIKE PRICE']):
-            recent_undrlng_st = group['UNDRLNG_ST'].iloc[0] if len(group) > 0 else "N/A"
-            old_undrlng_st = group['UNDRLNG_ST'].iloc[1] if len(group) > 1 and pd.notna(group['UNDRLNG_ST'].iloc[1]) else recent_undrlng_st
-            undrlng_st_final = recent_undrlng_st if pd.notna(recent_undrlng_st) else old_undrlng_st
-            final_data.append({
-                'TICKER': ticker,
-                'STRIKE PRICE': strike,
-                'MOST_RECENT_UNDRLNG_ST': recent_undrlng_st,
-                'FALLBACK_1DAY_UNDRLNG_ST': old_undrlng_st,
-                'DISPLAY_UNDRLNG_ST': undrlng_st_final
-            })
-        return pd.DataFrame(final_data)
-
-    df_undrlng = get_recent_or_1day_undrlng_st(df_filtered)
-
-    # Function to Calculate Day-wise Gain
-    def calculate_daywise_gain(df, days):
-        df_sorted = df.sort_values(['TICKER', 'EXPIRY', 'STRIKE PRICE', 'DATE'])
-        gain_data = []
-        for (ticker, expiry, type_, strike), group in df_sorted.groupby(['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE']):
-            if days is None:
-                low_price = group['LOW_PRICE'].min()
-                close_price = group['CLOSE_PRIC'].iloc[-1]
+    with trace.stage("filters"):
+        mode = scan_modes[st.sidebar.radio("Scan Mode", list(scan_modes))]
+        filters = select_filters(index, st.sidebar)
+        if mode is None:
+            gain_threshold = st.sidebar.slider("Gain % Threshold", min_value=1, max_value=3000, value=10, step=50)
+            strike_greater_than_undrlng = st.sidebar.checkbox("Show only Strike Price > Underlying Value", value=False)
+            iv_range, delta_range = select_greek_filters(st.sidebar)
+
+            days_option = st.sidebar.selectbox("Select Day Range", ["1 Day", "2 Days", "3 Days", "Custom"])
+            if days_option == "Custom":
+                custom_days = st.sidebar.number_input("Enter Custom Days", min_value=1, max_value=30, value=5)
+                days = custom_days
             else:
-                if len(group) >= days:
-                    low_price = group.iloc[-days]['LOW_PRICE']
-                else:
-                    low_price = group['LOW_PRICE'].iloc[0]
-                close_price = group['CLOSE_PRIC'].iloc[-1]
-            gain_percent = int(((close_price - low_price) / low_price) * 100) if low_price != 0 else 0
-            gain_data.append({
-                'TICKER': ticker,
-                'EXPIRY': expiry,
-                'TYPE': type_,
-                'STRIKE PRICE': strike,
-                'CLOSE_PRIC': close_price,
-                'LOW_PRICE': low_price,
-                'GAIN_PERCENT': gain_percent
-            })
-        return pd.DataFrame(gain_data)
-
-    if days is None:
-        df_grouped = df_filtered.groupby(['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE']).agg({
-            'LOW_PRICE': 'min',
-            'CLOSE_PRIC': 'last',
-            'DATE': 'last'
-        }).reset_index()
-        df_grouped['GAIN_PERCENT'] = ((df_grouped['CLOSE_PRIC'] - df_grouped['LOW_PRICE']) / df_grouped['LOW_PRICE']) * 100
-        df_daywise = df_grouped
-    else:
-        df_daywise = calculate_daywise_gain(df_filtered, days)
-
-    df_final = pd.merge(df_daywise, df_undrlng, how='left', on=['TICKER', 'STRIKE PRICE'])
-    df_final_filtered = df_final[df_final['GAIN_PERCENT'] >= gain_threshold]
-
-    if strike_greater_than_undrlng:
-        df_final_filtered['DISPLAY_UNDRLNG_ST'] = pd.to_numeric(df_final_filtered['DISPLAY_UNDRLNG_ST'], errors='coerce')
-        df_final_filtered = df_final_filtered[
-            (df_final_filtered['STRIKE PRICE'] > df_final_filtered['DISPLAY_UNDRLNG_ST']) &
-            (df_final_filtered['DISPLAY_UNDRLNG_ST'].notna())
-        ]
-
-    gain_input = st.sidebar.text_input("Filter by Gain % Above", "50")
-    try:
-        gain_input_value = float(gain_input)
-        df_final_filtered = df_final_filtered[df_final_filtered['GAIN_PERCENT'] >= gain_input_value]
-    except ValueError:
-        st.warning("Invalid input. Please enter a numeric value.")
-
-    st.dataframe(df_final_filtered[['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE', 'DISPLAY_UNDRLNG_ST', 'CLOSE_PRIC', 'LOW_PRICE', 'GAIN_PERCENT']])
+                days = int(days_option.split()[0])
+    if mode is not None:
+        render_activity(mode, cache, version, index, filters, trace)
+        show_cache_stats(cache)
+        return
 
-    fig = px.bar(
-        df_final_filtered,
-        x='TICKER',
-        y='GAIN_PERCENT',
-        color='TYPE',
-        title="Filtered Options with High Gains",
-        hover_data=['EXPIRY', 'STRIKE PRICE', 'DISPLAY_UNDRLNG_ST']
-    )
-    st.plotly_chart(fig)
+    # Apply Filters
+    with trace.stage("scan", rows_in=len(index.df)) as record:
+        df_filtered, panel, df_undrlng = load_scan(cache, version, index, filters)
+        record["rows_out"] = len(df_filtered)
+
+    with trace.stage("gains", rows_in=len(df_filtered)) as record:
+        if days is None:
+            df_grouped = df_filtered.groupby(['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE'], observed=True).agg({
+                'LOW_PRICE': 'min',
+                'CLOSE_PRIC': 'last',
+                'DATE': 'last'
+            }).reset_index()
+            df_grouped['GAIN_PERCENT'] = ((df_grouped['CLOSE_PRIC'] - df_grouped['LOW_PRICE']) / df_grouped['LOW_PRICE']) * 100
+            df_daywise = df_grouped
+        else:
+            df_daywise = panel.gains(days)
+        record["rows_out"] = len(df_daywise)
+
+    with trace.stage("merge", rows_in=len(df_daywise)) as record:
+        df_final = pd.merge(df_daywise, df_undrlng, how='left', on=['TICKER', 'STRIKE PRICE'])
+        record["rows_out"] = len(df_final)
+
+    with trace.stage("threshold_filter", rows_in=len(df_final)) as record:
+        df_final_filtered = df_final[df_final['GAIN_PERCENT'] >= gain_threshold]
+
+        if strike_greater_than_undrlng:
+            df_final_filtered['DISPLAY_UNDRLNG_ST'] = pd.to_numeric(df_final_filtered['DISPLAY_UNDRLNG_ST'], errors='coerce')
+            df_final_filtered = df_final_filtered[
+                (df_final_filtered['STRIKE PRICE'] > df_final_filtered['DISPLAY_UNDRLNG_ST']) &
+                (df_final_filtered['DISPLAY_UNDRLNG_ST'].notna())
+            ]
+
+        gain_input = st.sidebar.text_input("Filter by Gain % Above", "50")
+        try:
+            gain_input_value = float(gain_input)
+            df_final_filtered = df_final_filtered[df_final_filtered['GAIN_PERCENT'] >= gain_input_value]
+        except ValueError:
+            st.warning("Invalid input. Please enter a numeric value.")
+        df_final_filtered = df_final_filtered[greek_mask(df_final_filtered, iv_range, delta_range)]
+        record["rows_out"] = len(df_final_filtered)
+
+    with trace.stage("table", rows_in=len(df_final_filtered)):
+        show_results_table(df_final_filtered, result_columns)
+
+    with trace.stage("chart", rows_in=len(df_final_filtered)):
+        show_gain_chart(df_final_filtered)
+
+    show_cache_stats(cache)
 
 # Run the app
 if __name__ == "__main__":
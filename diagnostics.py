@@ -0,0 +1,121 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import store
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stage timings are appended to output/diagnostics.jsonl; SCANNER_DIAGNOSTICS=0 turns the log off
+log_name = "diagnostics.jsonl"
+max_log_bytes = 10 * 2**20
+profile_dir_name = "profiles"
+log_lock = threading.Lock()
+
+def rss_mb():
+    """Resident memory of this process in MB (the peak where /proc is unavailable, 0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def log_path():
+    return os.path.join(store.destination_dir, log_name)
+
+class Trace:
+    """Per-stage wall time, rows in/out and memory delta of one run (an ingestion or a dashboard rerun).
+
+    Use `with trace.stage("name", rows_in=n) as record:` and set
+    `record["rows_out"]` inside the block. Records from worker processes
+    can be folded in with `extend`; `summary` sums repeated stages.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.run = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None, **extra):
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None, **extra}
+        memory = rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["memory_delta_mb"] = rss_mb() - memory
+            self.records.append(record)
+
+    def extend(self, records):
+        """Add records measured elsewhere (e.g. returned by ingestion workers)."""
+        self.records.extend(records)
+
+    def summary(self):
+        """One row per stage in first-seen order: summed seconds and rows, largest memory delta, call count."""
+        stages = {}
+        for record in self.records:
+            total = stages.setdefault(record["stage"], {"stage": record["stage"], "calls": 0, "seconds": 0.0,
+                                                        "rows_in": None, "rows_out": None,
+                                                        "memory_delta_mb": None})
+            total["calls"] += 1
+            total["seconds"] += record["seconds"]
+            for key in ("rows_in", "rows_out"):
+                if record.get(key) is not None:
+                    total[key] = (total[key] or 0) + record[key]
+            if total["memory_delta_mb"] is None or record["memory_delta_mb"] > total["memory_delta_mb"]:
+                total["memory_delta_mb"] = record["memory_delta_mb"]
+            for key, value in record.items():
+                total.setdefault(key, value)
+        return list(stages.values())
+
+    def write(self, path=None):
+        """Append the summary as JSON lines (one per stage) unless SCANNER_DIAGNOSTICS=0."""
+        if os.environ.get("SCANNER_DIAGNOSTICS", "1") == "0":
+            return
+        path = path or log_path()
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started))
+        lines = [json.dumps({"time": timestamp, "source": self.source, "run": self.run, **record}, default=str)
+                 for record in self.summary()]
+        with log_lock:
+            if os.path.exists(path) and os.path.getsize(path) > max_log_bytes:
+                os.replace(path, path + ".1")
+            with open(path, "a") as f:
+                f.write("\n".join(lines) + "\n")
+
+@contextmanager
+def profiled(name, top=30):
+    """cProfile the block and dump it to output/profiles/<name>-<timestamp>.prof.
+
+    Yields a dict that gets "path" and "stats" (the top functions by
+    cumulative time, as text) once the block exits.
+    """
+    result = {}
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield result
+    finally:
+        profile.disable()
+        directory = os.path.join(store.destination_dir, profile_dir_name)
+        os.makedirs(directory, exist_ok=True)
+        result["path"] = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        profile.dump_stats(result["path"])
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(top)
+        result["stats"] = text.getvalue()
@@ -0,0 +1,249 @@
+"""Concurrent downloader of F&O bhavcopy archives (fo<DDMMYY>.zip) into zip/.
+
+Every weekday in the range is requested through one pooled aiohttp
+session, at most --concurrency at a time, retrying connection errors,
+timeouts, 429 and 5xx responses with exponential backoff. A download is
+only placed in zip/ once it starts with the zip magic bytes, passes a CRC
+check of every member and holds an op*.csv; anything else (such as the
+HTML error pages the exchange serves for missing days) goes to
+quarantine/ with the reason next to it. 404s are holidays and are skipped.
+
+    python fetch.py --start 2025-01-01 --end 2025-03-31 --ingest
+    python fetch.py --check zip              # quarantine bad files already in zip/
+    python fetch.py --serve bench/scale-1/zip --port 8000   # local stand-in for the archive server
+    python fetch.py --start 2025-02-03 --end 2025-03-10 --base-url "http://127.0.0.1:8000/fo{date:%d%m%y}.zip"
+
+The archive URL template can also be set with SCANNER_ARCHIVE_URL.
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+import time
+import zipfile
+import zlib
+
+import aiohttp
+import pandas as pd
+from aiohttp import web
+
+from ingest import backup_dir, process_data, source_dir
+
+default_base_url = os.environ.get("SCANNER_ARCHIVE_URL",
+                                  "https://nsearchives.nseindia.com/archives/fo/mkt/fo{date:%d%m%y}.zip")
+quarantine_dir = "quarantine"
+zip_magic = b"PK\x03\x04"
+default_concurrency = 8
+default_retries = 4
+default_backoff = 0.5
+default_timeout = 30
+# The archive server rejects requests without browser-like headers
+request_headers = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "application/zip,application/octet-stream,*/*",
+    "Accept-Encoding": "gzip, deflate",
+}
+retry_statuses = {429, 500, 502, 503, 504}
+
+def archive_name(date):
+    """fo<DDMMYY>.zip, the name ingest.trade_date reads the trade date from."""
+    return f"fo{date:%d%m%y}.zip"
+
+def trading_days(start, end):
+    """Weekdays from `start` to `end` inclusive; exchange holidays are left to the server's 404."""
+    return list(pd.bdate_range(start, end))
+
+def validate_archive(data):
+    """Return None for a readable bhavcopy zip, or the reason it is rejected."""
+    if not data.startswith(zip_magic):
+        head = data[:64].lstrip().lower()
+        return "html page" if head.startswith((b"<!doctype", b"<html")) else "not a zip (bad magic bytes)"
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            broken = archive.testzip()
+            if broken is not None:
+                return f"corrupt member {broken}"
+            if not any(os.path.basename(name).startswith("op") and name.endswith(".csv")
+                       for name in archive.namelist()):
+                return "no op*.csv member"
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, zlib.error, EOFError, OSError) as exc:
+        return f"bad zip ({exc})"
+    return None
+
+def write_atomic(path, data):
+    """Write through a .part file so directory watchers and readers never see a partial archive."""
+    tmp_path = path + ".part"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def quarantine(name, data, reason, directory=quarantine_dir):
+    """Keep a rejected download under `directory` with its rejection reason in <name>.reason."""
+    os.makedirs(directory, exist_ok=True)
+    write_atomic(os.path.join(directory, name), data)
+    with open(os.path.join(directory, name + ".reason"), "w") as f:
+        f.write(reason + "\n")
+
+def accept(name, data, destination, quarantine_to):
+    """Validate a download and place it in `destination` or quarantine; returns (status, reason)."""
+    reason = validate_archive(data)
+    if reason is not None:
+        quarantine(name, data, reason, quarantine_to)
+        return "quarantined", reason
+    write_atomic(os.path.join(destination, name), data)
+    return "fetched", None
+
+async def download(session, url, retries=default_retries, backoff=default_backoff):
+    """GET `url`, retrying transient failures with exponential backoff and jitter.
+
+    Returns (http status or None, body or None, attempts). A 404 is
+    returned at once; Retry-After is honoured when it asks for longer.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        status, delay = None, None
+        try:
+            async with session.get(url) as response:
+                status = response.status
+                if status == 200:
+                    return status, await response.read(), attempt
+                if status not in retry_statuses:
+                    return status, None, attempt
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        if attempt > retries:
+            return status, None, attempt
+        wait = backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+        await asyncio.sleep(max(wait, delay or 0))
+
+async def fetch_archive(session, semaphore, date, base_url, destination, quarantine_to, overwrite=False,
+                        retries=default_retries, backoff=default_backoff, skip_dirs=()):
+    """Download one trading day's archive; returns a result dict (date, name, status, attempts, bytes, reason).
+
+    The day is skipped when `destination` or one of `skip_dirs` already holds its archive.
+    """
+    name = archive_name(date)
+    result = {"date": date.strftime("%Y-%m-%d"), "name": name, "status": None, "attempts": 0, "bytes": 0,
+              "reason": None}
+    if not overwrite and any(os.path.exists(os.path.join(directory, name)) for directory in (destination, *skip_dirs)):
+        result["status"] = "exists"
+        return result
+    async with semaphore:
+        status, data, result["attempts"] = await download(session, base_url.format(date=date), retries, backoff)
+    if data is None:
+        result["status"] = "missing" if status == 404 else "failed"
+        result["reason"] = f"HTTP {status}" if status else "connection failed"
+        return result
+    result["bytes"] = len(data)
+    # CRC checks and file writes run off the event loop so other downloads keep streaming
+    result["status"], result["reason"] = await asyncio.to_thread(accept, name, data, destination, quarantine_to)
+    return result
+
+async def fetch_dates(dates, base_url=default_base_url, destination=source_dir, quarantine_to=quarantine_dir,
+                      concurrency=default_concurrency, retries=default_retries, backoff=default_backoff,
+                      timeout=default_timeout, overwrite=False, skip_dirs=()):
+    """Fetch every date in `dates` over one pooled session with at most `concurrency` requests in flight."""
+    os.makedirs(destination, exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    async with aiohttp.ClientSession(connector=connector, headers=request_headers,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        return await asyncio.gather(*(fetch_archive(session, semaphore, date, base_url, destination, quarantine_to,
+                                                    overwrite, retries, backoff, skip_dirs) for date in dates))
+
+def fetch(start, end, **options):
+    """Synchronous entry point: fetch the archives of every trading day from `start` to `end`."""
+    return asyncio.run(fetch_dates(trading_days(start, end), **options))
+
+def check_directory(directory=source_dir, quarantine_to=quarantine_dir):
+    """Move every fo*.zip in `directory` that fails validate_archive to quarantine; returns [(name, reason)]."""
+    moved = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not (name.startswith("fo") and name.endswith(".zip")) or not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        reason = validate_archive(data)
+        if reason is not None:
+            quarantine(name, data, reason, quarantine_to)
+            os.remove(path)
+            moved.append((name, reason))
+    return moved
+
+def stand_in_app(directory):
+    """aiohttp app serving `directory` as a local stand-in for the archive server (404 for missing days)."""
+    app = web.Application()
+    app.router.add_static("/", directory)
+    return app
+
+def summarize(results):
+    """Count results by status."""
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return counts
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Download F&O bhavcopy archives concurrently into zip/.")
+    parser.add_argument("--start", help="first trade date (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="last trade date (default: --start)")
+    parser.add_argument("--base-url", default=default_base_url,
+                        help="archive URL template, formatted with date= (default: %(default)s)")
+    parser.add_argument("--output", default=source_dir, help="directory for accepted archives")
+    parser.add_argument("--quarantine", default=quarantine_dir, help="directory for rejected downloads")
+    parser.add_argument("--concurrency", type=int, default=default_concurrency, help="requests in flight")
+    parser.add_argument("--retries", type=int, default=default_retries, help="retries per archive")
+    parser.add_argument("--backoff", type=float, default=default_backoff, help="first retry delay in seconds")
+    parser.add_argument("--timeout", type=float, default=default_timeout, help="per-request timeout in seconds")
+    parser.add_argument("--overwrite", action="store_true", help="download days that already have an archive")
+    parser.add_argument("--skip-dir", action="append", default=None, metavar="DIR",
+                        help=f"also skip days whose archive is in DIR (repeatable; default: {backup_dir})")
+    parser.add_argument("--ingest", action="store_true", help="ingest the archives after fetching")
+    parser.add_argument("--check", metavar="DIR", help="quarantine invalid archives already in DIR and exit")
+    parser.add_argument("--serve", metavar="DIR", help="serve DIR as a local stand-in archive server and exit")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    if not (args.start or args.check or args.serve):
+        parser.error("one of --start, --check or --serve is required")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.serve:
+        web.run_app(stand_in_app(args.serve), host=args.host, port=args.port)
+        return 0
+    if args.check:
+        moved = check_directory(args.check, args.quarantine)
+        for name, reason in moved:
+            print(f"{name}: {reason} -> {args.quarantine}")
+        print(f"{len(moved)} invalid archive(s) quarantined")
+        return 0
+
+    start = time.perf_counter()
+    results = fetch(args.start, args.end or args.start, base_url=args.base_url, destination=args.output,
+                    quarantine_to=args.quarantine, concurrency=args.concurrency, retries=args.retries,
+                    backoff=args.backoff, timeout=args.timeout, overwrite=args.overwrite,
+                    skip_dirs=args.skip_dir if args.skip_dir is not None else [backup_dir])
+    for result in results:
+        if result["status"] in ("quarantined", "failed"):
+            print(f"{result['name']}: {result['status']} ({result['reason']}, {result['attempts']} attempt(s))")
+    counts = summarize(results)
+    print(", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+          + f" in {time.perf_counter() - start:.1f}s")
+    if args.ingest and counts.get("fetched"):
+        # The default sources first, so days already ingested from zip/ or ZIPBK/ are not dropped
+        success, message = process_data(source_dirs=list(dict.fromkeys([source_dir, backup_dir, args.output])))
+        print(message)
+    return 1 if counts.get("failed") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
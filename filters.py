@@ -0,0 +1,63 @@
+import numpy as np
+
+# Sort order of the indexed frame; each distinct key tuple is one contract
+key_columns = ['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE']
+
+class FilterIndex:
+    """Lookup index over the dashboard frame for the sidebar filters.
+
+    The frame is sorted once by (TICKER, EXPIRY, TYPE, STRIKE PRICE, DATE)
+    and every contract keeps its [start, stop) row range, so a filter
+    combination is resolved on the small contract table and turned into
+    row slices instead of boolean masks over every row. The same table
+    drives the cascading option lists.
+    """
+
+    def __init__(self, df):
+        df = df.dropna(subset=key_columns)
+        self.df = df.sort_values(key_columns + ['DATE'], kind='stable').reset_index(drop=True)
+        grouped = self.df.groupby(key_columns, observed=True, sort=True)
+        self.contracts = grouped['Option Type'].first().reset_index()
+        sizes = grouped.size().to_numpy()
+        self.stop = np.cumsum(sizes)
+        self.start = self.stop - sizes
+
+    def match(self, ticker="All", expiry="All", type_filter="All", strike_price="All", option_type="All"):
+        """Boolean mask over the contract table for the given selections ("All" means no filter)."""
+        contracts = self.contracts
+        mask = np.ones(len(contracts), dtype=bool)
+        for col, value in (('TICKER', ticker), ('EXPIRY', expiry), ('TYPE', type_filter),
+                           ('STRIKE PRICE', strike_price), ('Option Type', option_type)):
+            if value != "All":
+                mask &= (contracts[col] == value).to_numpy()
+        return mask
+
+    def select(self, ticker="All", expiry="All", type_filter="All", strike_price="All", option_type="All"):
+        """Rows matching the sidebar selections, taken as slices of the sorted frame."""
+        if all(value == "All" for value in (ticker, expiry, type_filter, strike_price, option_type)):
+            return self.df
+        selected = np.flatnonzero(self.match(ticker, expiry, type_filter, strike_price, option_type))
+        if len(selected) == 0:
+            return self.df.iloc[:0]
+        if selected[-1] - selected[0] + 1 == len(selected):
+            return self.df.iloc[self.start[selected[0]]:self.stop[selected[-1]]]
+        starts = self.start[selected]
+        lengths = self.stop[selected] - starts
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.df.iloc[offsets + np.arange(lengths.sum())]
+
+    def options(self, ticker="All", expiry="All", type_filter="All"):
+        """Cascading sidebar option lists: each list only holds values compatible with the choices before it.
+
+        Strikes are only listed once a ticker is chosen.
+        """
+        contracts = self.contracts
+        by_ticker = contracts[self.match(ticker)]
+        by_expiry = by_ticker[(by_ticker['EXPIRY'] == expiry).to_numpy()] if expiry != "All" else by_ticker
+        by_type = by_expiry[(by_expiry['TYPE'] == type_filter).to_numpy()] if type_filter != "All" else by_expiry
+        return {
+            'TICKER': list(contracts['TICKER'].unique()),
+            'EXPIRY': sorted(by_ticker['EXPIRY'].unique()),
+            'TYPE': sorted(by_expiry['TYPE'].unique()),
+            'STRIKE PRICE': sorted(by_type['STRIKE PRICE'].unique()) if ticker != "All" else [],
+        }
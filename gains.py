@@ -0,0 +1,63 @@
+import numpy as np
+
+import store
+from greeks import greek_columns
+
+# One contract per (TICKER, EXPIRY, TYPE, STRIKE PRICE)
+group_columns = ['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE']
+max_window = 30
+
+class GainPanel:
+    """Contract x window arrays for the day-window gain computation.
+
+    Rows are grouped into contracts once; for every window `days` in
+    1..`window` the LOW_PRICE `days` rows back (or the contract's first row
+    when it has fewer rows) is gathered with a single fancy-indexing step,
+    so the whole gain matrix is computed at once and any window is then a
+    column lookup. IV and Greeks, when the frame has them, are taken from
+    each contract's latest row.
+    """
+
+    def __init__(self, df, window=max_window):
+        df = df.dropna(subset=group_columns)
+        grouped = df.groupby(group_columns, observed=True, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        self.window = window
+        self.contracts = grouped.size().index.to_frame(index=False)
+
+        # Sort rows by contract, then DATE, and find each contract's row range
+        order = np.lexsort((df['DATE'].to_numpy(), codes))
+        prices = store.restore_prices(df[['LOW_PRICE', 'CLOSE_PRIC']], ['LOW_PRICE', 'CLOSE_PRIC'])
+        low = prices['LOW_PRICE'].to_numpy()[order]
+        close = prices['CLOSE_PRIC'].to_numpy()[order]
+        counts = np.bincount(codes, minlength=len(self.contracts))
+        ends = np.cumsum(counts)
+        starts = ends - counts
+
+        # LOW_PRICE `days` rows back for days = 1..window, falling back to the first row
+        days = np.arange(1, window + 1)
+        rows_back = np.where(counts[:, None] >= days, ends[:, None] - days, starts[:, None])
+        self.close = close[ends - 1] if len(counts) else close[:0]
+        self.latest = {col: df[col].to_numpy()[order][ends - 1] if len(counts) else df[col].to_numpy()[:0]
+                       for col in greek_columns if col in df.columns}
+        self.low_matrix = low[rows_back]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gain = np.trunc((self.close[:, None] - self.low_matrix) / self.low_matrix * 100)
+        self.gain_matrix = np.where((self.low_matrix != 0) & np.isfinite(gain), gain, 0).astype('int64')
+
+    def gains(self, days):
+        """Return the calculate_daywise_gain table for a window of `days` rows."""
+        if not 1 <= days <= self.window:
+            raise ValueError(f"days must be between 1 and {self.window}, got {days}")
+        df = self.contracts.copy()
+        df['CLOSE_PRIC'] = self.close
+        df['LOW_PRICE'] = self.low_matrix[:, days - 1]
+        df['GAIN_PERCENT'] = self.gain_matrix[:, days - 1]
+        for col, values in self.latest.items():
+            df[col] = values
+        return df
+
+# Function to Calculate Day-wise Gain
+def calculate_daywise_gain(df, days):
+    """Calculate gain % with single row per strike price."""
+    return GainPanel(df, max(days, max_window)).gains(days)
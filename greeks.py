@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+# Columns added at ingest: IV in percent (annualised), DELTA, GAMMA, VEGA per 1 vol point, THETA per calendar day
+greek_columns = ['IV', 'DELTA', 'GAMMA', 'VEGA', 'THETA']
+
+# Annual risk-free rate used for every contract (NSE options are European, no dividends)
+risk_free_rate = 0.065
+min_vol = 1e-4
+max_vol = 10.0
+max_iterations = 60
+price_tolerance = 1e-6
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+def norm_cdf(x):
+    """Standard normal CDF via a Chebyshev erfc fit (fractional error below 1.2e-7, also in the tails)."""
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.5 * z)
+    erfc = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277)))))))))
+    return np.where(x >= 0, 1 - 0.5 * erfc, 0.5 * erfc)
+
+def d1_d2(spot, strike, years, vol, rate):
+    root = vol * np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * years) / root
+    return d1, d1 - root
+
+def bs_price(spot, strike, years, vol, rate, call):
+    """Black-Scholes premium; `call` is a boolean array (False for puts)."""
+    d1, d2 = d1_d2(spot, strike, years, vol, rate)
+    discounted = strike * np.exp(-rate * years)
+    return np.where(call, spot * norm_cdf(d1) - discounted * norm_cdf(d2),
+                    discounted * norm_cdf(-d2) - spot * norm_cdf(-d1))
+
+def implied_volatility(price, spot, strike, years, call, rate=risk_free_rate):
+    """Black-Scholes implied volatility (annualised fraction) of every row at once.
+
+    In-the-money rows are solved as the out-of-the-money option of the
+    same strike (put-call parity), whose premium is just the time value,
+    which keeps deep ITM rows accurate. A Newton step is taken wherever it
+    stays inside the row's current [low, high] bracket, and a bisection
+    step otherwise, so every row converges; only unconverged rows are
+    iterated. Rows whose premium is outside the no-arbitrage bounds or
+    needs more than `max_vol`, or with no time left, get NaN.
+    """
+    price, spot, strike, years = (np.asarray(value, dtype="float64") for value in (price, spot, strike, years))
+    call = np.asarray(call, dtype=bool)
+    discounted = strike * np.exp(-rate * years)
+    time_value = price - np.where(call, np.maximum(spot - discounted, 0), np.maximum(discounted - spot, 0))
+    otm_call = spot <= discounted
+    with np.errstate(invalid='ignore'):
+        valid = ((years > 0) & (spot > 0) & (strike > 0) & (time_value > 0)
+                 & (time_value < np.where(otm_call, spot, discounted)))
+
+    vol = np.full(price.shape, np.nan)
+    active = np.flatnonzero(valid)
+    p, s, k, t, c = time_value[active], spot[active], strike[active], years[active], otm_call[active]
+    low = np.full(len(active), min_vol)
+    high = np.full(len(active), max_vol)
+    # Brenner-Subrahmanyam starting point
+    sigma = np.clip(np.sqrt(2 * np.pi / t) * p / s, 0.05, 3.0)
+    for _ in range(max_iterations):
+        if not len(active):
+            break
+        diff = bs_price(s, k, t, sigma, rate, c) - p
+        done = np.abs(diff) < price_tolerance * p
+        vol[active[done]] = sigma[done]
+        keep = ~done
+        active, p, s, k, t, c = active[keep], p[keep], s[keep], k[keep], t[keep], c[keep]
+        sigma, diff, low, high = sigma[keep], diff[keep], low[keep], high[keep]
+        high = np.where(diff > 0, sigma, high)
+        low = np.where(diff > 0, low, sigma)
+        d1, _ = d1_d2(s, k, t, sigma, rate)
+        vega = s * norm_pdf(d1) * np.sqrt(t)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = sigma - diff / vega
+        sigma = np.where((newton > low) & (newton < high), newton, 0.5 * (low + high))
+    vol[active] = sigma
+    # Premiums richer than the max_vol price have no IV inside the bracket
+    with np.errstate(invalid='ignore'):
+        vol[vol >= max_vol * (1 - 1e-6)] = np.nan
+    return vol
+
+def greeks(price, spot, strike, years, call, rate=risk_free_rate):
+    """IV (percent), delta, gamma, vega (per vol point) and theta (per day) for every row, as a dict of arrays."""
+    vol = implied_volatility(price, spot, strike, years, call, rate)
+    spot, strike, years = (np.asarray(value, dtype="float64") for value in (spot, strike, years))
+    call = np.asarray(call, dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2 = d1_d2(spot, strike, years, vol, rate)
+        density = norm_pdf(d1)
+        root = np.sqrt(years)
+        carry = rate * strike * np.exp(-rate * years)
+        decay = -spot * density * vol / (2 * root)
+        return {
+            'IV': vol * 100,
+            'DELTA': np.where(call, norm_cdf(d1), norm_cdf(d1) - 1),
+            'GAMMA': density / (spot * vol * root),
+            'VEGA': spot * density * root / 100,
+            'THETA': np.where(call, decay - carry * norm_cdf(d2), decay + carry * norm_cdf(-d2)) / 365,
+        }
+
+def add_greeks(df, trade_date, rate=risk_free_rate):
+    """Add the greek_columns (float32) to one trading day's option rows, priced at CLOSE_PRIC."""
+    years = (df['EXPIRY'] - pd.Timestamp(trade_date)).dt.days.to_numpy(dtype="float64") / 365
+    price = df['CLOSE_PRIC'].to_numpy(dtype="float64").round(2)
+    values = greeks(price, df['UNDRLNG_ST'].to_numpy(dtype="float64"), df['STRIKE PRICE'].to_numpy(dtype="float64"),
+                    years, (df['TYPE'] == 'CE').to_numpy(), rate)
+    for col in greek_columns:
+        df[col] = values[col].astype("float32")
+    return df
+
+def greek_mask(df, iv_range=None, delta_range=None):
+    """Rows whose IV (percent) and absolute DELTA fall inside the given (low, high) ranges; None skips a filter."""
+    mask = np.ones(len(df), dtype=bool)
+    if iv_range is not None:
+        iv = df['IV'].to_numpy(dtype="float64")
+        mask &= (iv >= iv_range[0]) & (iv <= iv_range[1])
+    if delta_range is not None:
+        delta = np.abs(df['DELTA'].to_numpy(dtype="float64"))
+        mask &= (delta >= delta_range[0]) & (delta <= delta_range[1])
+    return mask
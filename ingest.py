@@ -0,0 +1,505 @@
+import copy
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+import store
+from diagnostics import Trace
+from greeks import add_greeks
+from store import load_manifest, save_manifest
+
+# Define directories
+source_dir = "zip"
+pattern = re.compile(r"^(?P<instrument>OPTSTK|OPTIDX)(?P<ticker>[A-Z]+)(?P<expiry>\d{2}-[A-Z]{3}-\d{4})"
+                     r"(?P<type>CE|PE)(?P<strike>[\d\.]+)$")
+future_pattern = re.compile(r"^(?P<instrument>FUTSTK|FUTIDX)(?P<ticker>[A-Z]+)(?P<expiry>\d{2}-[A-Z]{3}-\d{4})$")
+
+# Ensure source_dir exists
+if not os.path.exists(source_dir):
+    os.makedirs(source_dir)
+
+# Function from bhav.py to extract date
+def extract_date(folder_name):
+    """Extract date from folder or zip name and return formatted date (DD-MMM-YYYY)."""
+    match = re.search(r"(\d{2})(\d{2})(\d{2})$", folder_name.split(".")[0])
+    if match:
+        day, month, year = match.groups()
+        year = "20" + year if int(year) <= 50 else "19" + year
+        month_names = {
+            "01": "JAN", "02": "FEB", "03": "MAR", "04": "APR", "05": "MAY", "06": "JUN",
+            "07": "JUL", "08": "AUG", "09": "SEP", "10": "OCT", "11": "NOV", "12": "DEC"
+        }
+        month = month_names.get(month, month)
+        formatted_date = f"{day}-{month}-{year}"
+        return formatted_date
+    return ""
+
+# Declared schema of the exchange's op*.csv: the columns ingest reads (by name) and their types
+option_schema = {
+    "CONTRACT_D": pa.string(),
+    "PREVIOUS_S": pa.float32(),
+    "OPEN_PRICE": pa.float32(),
+    "HIGH_PRICE": pa.float32(),
+    "LOW_PRICE": pa.float32(),
+    "CLOSE_PRIC": pa.float32(),
+    "OI_NO_CON": pa.float64(),
+    "TRADED_QUA": pa.float64(),
+    "TRD_NO_CON": pa.float64(),
+    "UNDRLNG_ST": pa.float64(),
+}
+contract_columns = ["Option Type", "TICKER", "EXPIRY", "TYPE", "STRIKE PRICE"]
+# Columns of the options table, in order
+option_columns = (["CONTRACT_D"] + contract_columns
+                  + ["PREVIOUS_S", "OPEN_PRICE", "HIGH_PRICE", "LOW_PRICE", "CLOSE_PRIC", "UNDRLNG_ST",
+                     "OI_NO_CON", "TRADED_QUA", "TRD_NO_CON"])
+# Arrow types of the columns parse_contract_symbols adds
+contract_types = {"Option Type": pa.string(), "TICKER": pa.string(), "EXPIRY": pa.timestamp("us"),
+                  "TYPE": pa.string(), "STRIKE PRICE": pa.float64()}
+# Per ticker, expiry and day open interest and volume of the whole chain (before the strike filter)
+chain_columns = ["TICKER", "EXPIRY", "CE_OI", "PE_OI", "CE_VOLUME", "PE_VOLUME"]
+
+# Declared schema of the exchange's fo*.csv (futures), kept whole
+future_schema = {
+    "CONTRACT_D": pa.string(),
+    "PREVIOUS_S": pa.float32(),
+    "OPEN_PRICE": pa.float32(),
+    "HIGH_PRICE": pa.float32(),
+    "LOW_PRICE": pa.float32(),
+    "CLOSE_PRIC": pa.float32(),
+    "SETTLEMENT": pa.float32(),
+    "NET_CHANGE": pa.float32(),
+    "OI_NO_CON": pa.float64(),
+    "TRADED_QUA": pa.float64(),
+    "TRD_NO_CON": pa.float64(),
+    "TRADED_VAL": pa.float64(),
+}
+read_block_size = 1 << 20
+# Cells the numeric columns accept; anything else (such as the exchange's "-") becomes null
+numeric_text = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$"
+
+def reader_filters(tickers=None, instruments=None, drop_untraded=False):
+    """Row filters applied while reading op*.csv files, in the form recorded in the manifest."""
+    return {"tickers": sorted(tickers) if tickers else None,
+            "instruments": sorted(instruments) if instruments else None,
+            "drop_untraded": bool(drop_untraded)}
+
+# Columnar parser for CONTRACT_D symbols (Arrow's regex kernel, no Python objects per row)
+def parse_contract_symbols(contracts):
+    """Split an Arrow array of CONTRACT_D symbols into Option Type, TICKER, EXPIRY, TYPE and STRIKE PRICE arrays.
+
+    Rows that do not match `pattern` are null in every column.
+    """
+    parts = pc.extract_regex(contracts, pattern.pattern)
+    return {
+        "Option Type": pc.struct_field(parts, "instrument"),
+        "TICKER": pc.struct_field(parts, "ticker"),
+        "EXPIRY": pc.strptime(pc.struct_field(parts, "expiry"), format="%d-%b-%Y", unit="us"),
+        "TYPE": pc.struct_field(parts, "type"),
+        "STRIKE PRICE": pc.cast(pc.struct_field(parts, "strike"), pa.float64()),
+    }
+
+def text_types(schema):
+    """Column types that read every column of `schema` as text, for coerce_numeric to convert.
+
+    Read with strings_can_be_null so empty cells arrive as nulls, as they did with the numeric types.
+    """
+    return {name: pa.string() for name in schema}
+
+def coerce_numeric(column, type):
+    """Cast a text column to `type`, with null for cells that are not numbers (like pd.to_numeric(errors='coerce')).
+
+    Clean columns take a plain cast; only a column that fails it is matched against numeric_text.
+    """
+    try:
+        return pc.cast(column, type)
+    except pa.ArrowInvalid:
+        pass
+    numeric = pc.match_substring_regex(column, numeric_text)
+    return pc.cast(pc.if_else(numeric, pc.utf8_trim_whitespace(column), pa.scalar(None, pa.string())), type)
+
+def typed_columns(batch, schema):
+    """The columns of a batch (or table) read with text_types(schema), converted to `schema`."""
+    return {name: batch.column(name) if type == pa.string() else coerce_numeric(batch.column(name), type)
+            for name, type in schema.items()}
+
+# Sources of the csv files in an archive (read in memory, no extract-to-disk) or a folder
+def csv_sources(item_path, prefix="op"):
+    """Yield one readable source (zip member or path) per <prefix>*.csv of a fo*.zip archive or extracted fo* folder.
+
+    "op" selects the option files, "fo" the futures files.
+    """
+    if zipfile.is_zipfile(item_path):
+        with zipfile.ZipFile(item_path, 'r') as zip_ref:
+            for name in zip_ref.namelist():
+                file = os.path.basename(name)
+                if file.startswith(prefix) and file.endswith(".csv"):
+                    with zip_ref.open(name) as member:
+                        yield member
+    elif os.path.isdir(item_path):
+        for file in sorted(os.listdir(item_path)):
+            if file.startswith(prefix) and file.endswith(".csv"):
+                yield os.path.join(item_path, file)
+
+def read_option_files(item_path):
+    """Return one raw DataFrame (all columns) per op*.csv inside a fo*.zip archive or an extracted fo* folder."""
+    return [pd.read_csv(source) for source in csv_sources(item_path, "op")]
+
+def read_option_table(source, formatted_date, filters=None, trace=None):
+    """Read one op*.csv with `option_schema`, filtering each block of rows as it is parsed.
+
+    Numeric cells that do not parse (such as "-") are read as null rather
+    than failing the file.
+
+    Keeps contracts whose strike is above the underlying value, plus the
+    optional `filters` (see reader_filters): a ticker and an instrument
+    allow-list, and dropping contracts that did not trade. Rejected rows
+    stay inside Arrow and never become pandas rows. Returns a dict of
+    frames: "options" (the kept rows, with IV and Greeks from
+    greeks.add_greeks), "underlying" (the day's first underlying value per
+    ticker) and "chain" (CE/PE open interest and volume per ticker and
+    expiry), the last two taken from the allowed chain before the strike
+    and volume filters. Returns None when the file lacks a schema column.
+    """
+    filters = filters or reader_filters()
+    trace = trace or Trace("ingest")
+    try:
+        reader = pv.open_csv(source, read_options=pv.ReadOptions(block_size=read_block_size),
+                             convert_options=pv.ConvertOptions(include_columns=list(option_schema),
+                                                               column_types=text_types(option_schema),
+                                                               strings_can_be_null=True))
+    except KeyError:
+        return None
+
+    kept, firsts, totals = [], [], []
+    for batch in reader:
+        with trace.stage("convert", rows_in=batch.num_rows) as record:
+            values = typed_columns(batch, option_schema)
+            record["rows_out"] = batch.num_rows
+        with trace.stage("parse_contracts", rows_in=batch.num_rows) as record:
+            parts = parse_contract_symbols(values["CONTRACT_D"])
+            record["rows_out"] = batch.num_rows - parts["TICKER"].null_count
+        with trace.stage("filter", rows_in=batch.num_rows) as record:
+            underlying = values["UNDRLNG_ST"]
+            allowed = pc.is_valid(parts["TICKER"])
+            if filters["tickers"]:
+                allowed = pc.and_(allowed, pc.is_in(parts["TICKER"], pa.array(filters["tickers"])))
+            if filters["instruments"]:
+                allowed = pc.and_(allowed, pc.is_in(parts["Option Type"], pa.array(filters["instruments"])))
+            chain = pa.table({"TICKER": parts["TICKER"], "EXPIRY": parts["EXPIRY"], "TYPE": parts["TYPE"],
+                              "UNDRLNG_ST": underlying, "OI_NO_CON": values["OI_NO_CON"],
+                              "TRADED_QUA": values["TRADED_QUA"]}).filter(allowed)
+            firsts.append(chain.group_by("TICKER", use_threads=False).aggregate([("UNDRLNG_ST", "first")]))
+            totals.append(chain.group_by(["TICKER", "EXPIRY", "TYPE"], use_threads=False)
+                          .aggregate([("OI_NO_CON", "sum"), ("TRADED_QUA", "sum")]))
+
+            keep = pc.and_(allowed, pc.greater(parts["STRIKE PRICE"], underlying))
+            if filters["drop_untraded"]:
+                keep = pc.and_(keep, pc.greater(values["TRADED_QUA"], 0))
+            columns = {**parts, **values}
+            close = columns["CLOSE_PRIC"]
+            columns["CLOSE_PRIC"] = pc.if_else(pc.equal(close, 0), pa.scalar(0.05, pa.float32()), close)
+            kept.append(pa.table({name: columns[name] for name in option_columns}).filter(keep))
+            record["rows_out"] = kept[-1].num_rows
+
+    if kept:
+        options = pa.concat_tables(kept)
+    else:
+        # A header-only file: an empty table with the real types, so add_greeks still sees dates and floats
+        types = {**contract_types, **option_schema}
+        options = pa.schema([(name, types[name]) for name in option_columns]).empty_table()
+    for name in ("Option Type", "TICKER", "TYPE"):
+        options = options.set_column(options.schema.get_field_index(name), name,
+                                     pc.dictionary_encode(options.column(name)))
+    df = options.to_pandas()
+    df["TYPE"] = df["TYPE"].astype(pd.CategoricalDtype(["CE", "PE"]))
+    df["DATE"] = formatted_date
+    with trace.stage("greeks", rows_in=len(df)):
+        df = add_greeks(df, pd.to_datetime(formatted_date, format="%d-%b-%Y"))
+
+    firsts = pa.concat_tables(firsts).to_pandas() if firsts else pd.DataFrame(columns=["TICKER", "UNDRLNG_ST_first"])
+    underlying = (firsts.dropna().groupby("TICKER", sort=True, as_index=False)["UNDRLNG_ST_first"].first()
+                  .rename(columns={"UNDRLNG_ST_first": "UNDRLNG_ST"}))
+    underlying["DATE"] = formatted_date
+    return {"options": df, "underlying": underlying, "chain": chain_totals(totals, formatted_date)}
+
+def chain_totals(totals, formatted_date):
+    """Sum per-block (TICKER, EXPIRY, TYPE) open interest and volume into one chain_columns row per ticker and expiry."""
+    if not totals:
+        return pd.DataFrame(columns=chain_columns + ["DATE"])
+    sums = pa.concat_tables(totals).to_pandas().rename(columns={"OI_NO_CON_sum": "OI", "TRADED_QUA_sum": "VOLUME"})
+    chain = sums.pivot_table(index=["TICKER", "EXPIRY"], columns="TYPE", values=["OI", "VOLUME"],
+                             aggfunc="sum", fill_value=0.0)
+    chain.columns = [f"{kind}_{value}" for value, kind in chain.columns]
+    chain = chain.reindex(columns=chain_columns[2:], fill_value=0.0).reset_index()
+    chain["DATE"] = formatted_date
+    return chain
+
+def read_future_table(source, formatted_date, filters=None):
+    """Read one fo*.csv with `future_schema` into the futures table (INSTRUMENT, TICKER, EXPIRY added).
+
+    Only the ticker allow-list of `filters` applies, and numeric cells that
+    do not parse are null. Returns None when the file lacks a schema column.
+    """
+    filters = filters or reader_filters()
+    try:
+        table = pv.read_csv(source, convert_options=pv.ConvertOptions(include_columns=list(future_schema),
+                                                                      column_types=text_types(future_schema),
+                                                                      strings_can_be_null=True))
+    except KeyError:
+        return None
+    values = typed_columns(table, future_schema)
+    parts = pc.extract_regex(values["CONTRACT_D"], future_pattern.pattern)
+    ticker = pc.struct_field(parts, "ticker")
+    keep = pc.is_valid(ticker)
+    if filters["tickers"]:
+        keep = pc.and_(keep, pc.is_in(ticker, pa.array(filters["tickers"])))
+    df = pa.table({
+        "CONTRACT_D": values["CONTRACT_D"],
+        "INSTRUMENT": pc.struct_field(parts, "instrument"),
+        "TICKER": ticker,
+        "EXPIRY": pc.strptime(pc.struct_field(parts, "expiry"), format="%d-%b-%Y", unit="us"),
+        **{name: values[name] for name in future_schema if name != "CONTRACT_D"},
+    }).filter(keep).to_pandas()
+    df["DATE"] = formatted_date
+    return df
+
+# Function to load one archive or folder; runs inside the worker processes
+def load_item(item_path, filters=None):
+    """Load and clean every op*.csv of one fo* archive or folder.
+
+    Zip archives and extracted folders go through the same reader, so both
+    give identical tables. Returns a dict of store table name -> list of
+    DataFrames, plus the worker's stage records under "trace" and, when
+    the archive could not be read (e.g. a corrupt zip member), the reason
+    under "error" with every table empty.
+    """
+    item = os.path.basename(item_path)
+    formatted_date = extract_date(item.split(".")[0])
+    tables = {table: [] for table in store.tables}
+    trace = Trace("ingest")
+    try:
+        for source in csv_sources(item_path, "op"):
+            frames = read_option_table(source, formatted_date, filters, trace)
+            for table, df in (frames or {}).items():
+                if not df.empty:
+                    tables[table].append(df)
+        with trace.stage("futures") as record:
+            for source in csv_sources(item_path, "fo"):
+                df = read_future_table(source, formatted_date, filters)
+                if df is not None and not df.empty:
+                    tables["futures"].append(df)
+            record["rows_out"] = sum(len(df) for df in tables["futures"])
+        tables["error"] = None
+    except Exception as exc:  # one unreadable archive must not stop the others from being published
+        tables = {table: [] for table in store.tables}
+        tables["error"] = f"{type(exc).__name__}: {exc}"
+    tables["trace"] = trace.records
+    return tables
+
+def trade_date(item):
+    """Return the trade date encoded in a fo* archive or folder name (NaT if there is none)."""
+    return pd.to_datetime(extract_date(item.split(".")[0]), format="%d-%b-%Y", errors="coerce")
+
+def item_sort_key(item):
+    """Sort key that orders items by trade date, undated items last."""
+    date = trade_date(item)
+    return (pd.isna(date), date.value if pd.notna(date) else 0, item)
+
+def list_items(directory):
+    """List fo*.zip archives and extracted fo* folders in `directory`, ordered by trade date."""
+    items = []
+    for item in os.listdir(directory):
+        item_path = os.path.join(directory, item)
+        if item.startswith("fo") and (item.endswith(".zip") or os.path.isdir(item_path)):
+            items.append(item)
+    items.sort(key=item_sort_key)
+    return [os.path.join(directory, item) for item in items]
+
+# Manifest of ingested archives, used to only touch new or changed days
+backup_dir = "ZIPBK"
+
+def content_hash(item_path):
+    """SHA-256 of a zip archive, or of the op*.csv and fo*.csv files of an extracted folder."""
+    digest = hashlib.sha256()
+    if os.path.isdir(item_path):
+        paths = [os.path.join(item_path, file) for file in sorted(os.listdir(item_path))
+                 if file.startswith(("op", "fo")) and file.endswith(".csv")]
+    else:
+        paths = [item_path]
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+def item_stat(item_path):
+    """Return (size, mtime_ns) of an archive, or the totals of an extracted folder."""
+    if os.path.isdir(item_path):
+        stats = [os.stat(os.path.join(item_path, file)) for file in os.listdir(item_path)]
+        return sum(s.st_size for s in stats), max((s.st_mtime_ns for s in stats), default=0)
+    stat = os.stat(item_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def scan_sources(manifest, source_dirs):
+    """Describe every archive in `source_dirs`, one entry per trading day.
+
+    Hashes are reused from the manifest when size and mtime are unchanged.
+    When the same day appears more than once (e.g. zip/ and ZIPBK/), the
+    first directory wins and the other copies are returned as duplicates.
+    """
+    known = {entry["path"]: entry for entry in manifest["archives"].values()}
+    days, duplicates = {}, []
+    for directory in source_dirs:
+        if not os.path.isdir(directory):
+            continue
+        for item_path in list_items(directory):
+            item = os.path.basename(item_path)
+            formatted_date = extract_date(item.split(".")[0])
+            if not formatted_date:
+                continue
+            size, mtime_ns = item_stat(item_path)
+            previous = known.get(item_path)
+            if previous and previous["size"] == size and previous.get("mtime_ns") == mtime_ns:
+                sha256 = previous["sha256"]
+            else:
+                sha256 = content_hash(item_path)
+            entry = {"name": item, "path": item_path, "size": size, "mtime_ns": mtime_ns, "sha256": sha256,
+                     "trade_date": formatted_date, "partition": store.partition_name(formatted_date)}
+            if formatted_date in days:
+                duplicates.append({"path": item_path, "sha256": sha256, "kept": days[formatted_date]["path"]})
+            else:
+                days[formatted_date] = entry
+    return days, duplicates
+
+def load_items(item_paths, workers=None, filters=None, progress=None):
+    """Run load_item over `item_paths`, in a process pool unless workers == 1.
+
+    `progress(done, total)` is called after every archive.
+    """
+    load = partial(load_item, filters=filters)
+    progress = progress or (lambda done, total: None)
+    results = []
+    if workers == 1 or len(item_paths) <= 1:
+        for item_path in item_paths:
+            results.append(load(item_path))
+            progress(len(results), len(item_paths))
+        return results
+    # Forking a threaded process (the dashboard's ingestion worker) can deadlock, so spawn there
+    context = None if threading.current_thread() is threading.main_thread() else multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        for tables in executor.map(load, item_paths):
+            results.append(tables)
+            progress(len(results), len(item_paths))
+    return results
+
+# Function to process data (bhav.py logic)
+def process_data(workers=None, full=False, source_dirs=None, trace=None, tickers=None, instruments=None,
+                 drop_untraded=False, progress=None):
+    """Bring the partitioned store up to date with the archives in `source_dirs`.
+
+    Only new or changed archives are read and written as new date partitions;
+    partitions of archives that disappeared are dropped. `full=True` ignores
+    the manifest and rebuilds everything. New partitions go to directories
+    of the next data version and are published by the atomic manifest
+    write, so readers never see a half-ingested store; directories neither
+    the new nor the previous manifest uses are deleted afterwards. The whole
+    run holds store.ingest_lock, so concurrent ingestions (the dashboard's
+    worker, scan.py, fetch.py) queue up instead of writing the same
+    directories; days whose partitions are missing are re-ingested.
+    Archives that fail to load are left out and listed under "failed" in
+    the manifest (with the error), and are not retried until they change.
+    Archives are read in memory and spread across `workers` processes
+    (defaults to the CPU count; 1 runs everything in this process).
+
+    `tickers`, `instruments` and `drop_untraded` are applied while reading
+    (see read_option_table); the store is rebuilt whenever they change.
+    `progress(done, total)` is called as archives are loaded.
+
+    Every stage is timed into `trace` (a new one when not given), which is
+    appended to the diagnostics log at the end. Worker stages (convert,
+    parse_contracts, filter, greeks, futures) are summed over archives.
+    """
+    trace = trace or Trace("process_data")
+    with ExitStack() as stack:
+        with trace.stage("wait_for_lock"):
+            stack.enter_context(store.ingest_lock())
+        filters = reader_filters(tickers, instruments, drop_untraded)
+        published = manifest = load_manifest()
+        if (full or not os.path.exists(store.manifest_path) or not os.path.isdir(store.options_dir)
+                or manifest.get("format") != store.store_format
+                or manifest.get("filters", reader_filters()) != filters):
+            manifest = {"version": manifest["version"], "format": store.store_format, "archives": {},
+                        "duplicates": [], "filters": filters}
+        else:
+            manifest = copy.deepcopy(manifest)
+        generation = manifest["version"] + 1
+
+        with trace.stage("scan_sources") as record:
+            days, duplicates = scan_sources(manifest, source_dirs or [source_dir, backup_dir])
+            ingested = manifest["archives"]
+            failed = {key: entry for key, entry in manifest.get("failed", {}).items()
+                      if key in days and entry["sha256"] == days[key]["sha256"]}
+            added = [key for key in days if key not in failed and (
+                key not in ingested or ingested[key]["sha256"] != days[key]["sha256"]
+                or not all(store.partition_exists(ingested[key], table) for table in store.tables))]
+            dropped = [key for key in ingested if key not in days]
+            record.update(rows_out=len(days), added=len(added), dropped=len(dropped))
+
+        for key in dropped:
+            ingested.pop(key)
+
+        added.sort(key=lambda key: item_sort_key(days[key]["name"]))
+        with trace.stage("load_items", rows_in=len(added), workers=workers) as record:
+            results = load_items([days[key]["path"] for key in added], workers, filters, progress)
+            loaded = record["rows_out"] = sum(len(df) for tables in results for df in tables["options"])
+        for tables in results:
+            trace.extend(tables.pop("trace"))
+
+        for key, tables in zip(added, results):
+            if tables["error"]:
+                failed[key] = dict(days[key], error=tables["error"])
+        added = [key for key in added if key not in failed]
+        results = [tables for tables in results if not tables["error"]]
+
+        with trace.stage("write", rows_in=loaded) as record:
+            for key, tables in zip(added, results):
+                rows = store.write_day(tables["options"], days[key]["trade_date"], generation=generation)
+                for table in store.tables[1:]:
+                    store.write_day(tables[table], days[key]["trade_date"], table=table, generation=generation)
+                ingested[key] = dict(days[key], rows=rows,
+                                     directory=store.day_directory(days[key]["partition"], generation))
+            record["rows_out"] = sum(ingested[key]["rows"] for key in added)
+
+        with trace.stage("manifest"):
+            for key, entry in ingested.items():
+                entry.update({name: days[key][name] for name in ("path", "name", "mtime_ns")})
+            manifest["duplicates"] = duplicates
+            manifest["failed"] = failed
+            if added or dropped:
+                manifest["version"] = generation
+            save_manifest(manifest)
+
+        if added or dropped:
+            with trace.stage("collect_garbage") as record:
+                record["rows_out"] = store.collect_garbage(manifest, published)
+
+    trace.write()
+
+    skipped = "".join(f"; skipped {entry['name']} ({entry['error']})" for entry in failed.values())
+    if not any(entry["rows"] for entry in ingested.values()):
+        return False, "No valid CSV files found for processing." + skipped
+    if not added and not dropped:
+        return True, f"Processed data is up to date: {store.store_dir}" + skipped
+    return True, (f"Processed data saved at: {store.store_dir} "
+                  f"({len(added)} archive(s) ingested, {len(dropped)} removed)" + skipped)
@@ -0,0 +1,257 @@
+"""Live options gain monitor backing templates/dashboard.html.
+
+Keeps every contract's historical low (seeded from the ingested bhavcopy
+history), applies LTP ticks in O(1) each and pushes only threshold
+crossings to Socket.IO clients as batched `updates` events.
+
+    python monitor.py --replay zip/fo270325.zip zip/fo280325.zip --port 5000
+    python monitor.py --benchmark zip/fo280325.zip --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import socketio
+from aiohttp import web
+
+import store
+from ingest import pattern, read_option_files, trade_date
+
+template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "dashboard.html")
+default_threshold = 500
+
+class LowBook:
+    """Historical low and threshold state per contract, updated in O(1) per tick.
+
+    State is kept in plain lists indexed by slot: for one-at-a-time updates
+    they are much cheaper than NumPy scalar access.
+    """
+
+    def __init__(self, threshold=default_threshold):
+        self.threshold = threshold
+        self.index = {}
+        self.contracts = []
+        self.lows = []
+        self.above = []
+
+    def add(self, contract, low):
+        """Start tracking `contract` with historical low `low`; returns its slot."""
+        slot = len(self.contracts)
+        self.index[contract] = slot
+        self.contracts.append(contract)
+        self.lows.append(low)
+        self.above.append(False)
+        return slot
+
+    @classmethod
+    def from_history(cls, df, threshold=default_threshold):
+        """Seed lows from stored rows: the minimum positive LOW_PRICE of each CONTRACT_D."""
+        book = cls(threshold)
+        df = store.restore_prices(df[df['LOW_PRICE'] > 0], ['LOW_PRICE'])
+        lows = df.groupby('CONTRACT_D', observed=True)['LOW_PRICE'].min()
+        for contract, low in zip(lows.index.astype(str), lows.to_numpy().tolist()):
+            book.add(contract, low)
+        return book
+
+    def tick(self, contract, ltp):
+        """Apply one LTP tick; return an alert dict if it crosses the threshold upwards, else None.
+
+        Unknown contracts start tracking with the tick as their low; a tick
+        below the low lowers it.
+        """
+        slot = self.index.get(contract)
+        if slot is None:
+            if ltp > 0:
+                self.add(contract, ltp)
+            return None
+        low = self.lows[slot]
+        if 0 < ltp < low:
+            self.lows[slot] = low = ltp
+        gain = (ltp - low) / low * 100
+        if gain >= self.threshold:
+            if not self.above[slot]:
+                self.above[slot] = True
+                return self.alert(slot, ltp, gain)
+        elif self.above[slot]:
+            self.above[slot] = False
+        return None
+
+    def alert(self, slot, ltp, gain):
+        """The `update` payload expected by templates/dashboard.html."""
+        contract = self.contracts[slot]
+        match = pattern.match(contract)
+        return {
+            "symbol": match.group(2) if match else contract,
+            "trading_symbol": contract,
+            "strike_price": float(match.group(5)) if match else None,
+            "option_type": match.group(4) if match else None,
+            "historical_low": self.lows[slot],
+            "ltp": ltp,
+            "percentage_increase": round(gain, 2),
+        }
+
+class GainMonitor:
+    """Fans threshold crossings out to subscribed clients, batched and rate-limited per client.
+
+    Each client gets at most `max_batch` alerts per `flush_interval`
+    seconds; anything beyond that waits for the next flush, keeping only
+    the newest alert per contract.
+    """
+
+    def __init__(self, book, sio=None, flush_interval=0.5, max_batch=200):
+        self.book = book
+        self.sio = sio
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.clients = {}
+        self.ticks = 0
+        self.alerts = 0
+
+    def subscribe(self, sid, symbol=None):
+        """Register a client; `symbol` limits its alerts to one ticker."""
+        self.clients[sid] = {"symbol": symbol.upper() if symbol else None, "pending": {}}
+
+    def unsubscribe(self, sid):
+        self.clients.pop(sid, None)
+
+    def on_tick(self, contract, ltp):
+        self.ticks += 1
+        alert = self.book.tick(contract, ltp)
+        if alert is None:
+            return
+        self.alerts += 1
+        for client in self.clients.values():
+            if client["symbol"] in (None, alert["symbol"]):
+                client["pending"][contract] = alert
+
+    async def consume(self, source):
+        """Apply every tick batch from an async `source` of [(contract, ltp), ...] lists."""
+        async for batch in source:
+            for contract, ltp in batch:
+                self.on_tick(contract, ltp)
+            await asyncio.sleep(0)
+
+    async def flush_loop(self):
+        """Emit pending alerts to each client every `flush_interval` seconds."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            for sid, client in list(self.clients.items()):
+                pending = client["pending"]
+                if not pending:
+                    continue
+                contracts = list(pending)[:self.max_batch]
+                batch = [pending.pop(contract) for contract in contracts]
+                if self.sio is not None:
+                    await self.sio.emit("updates", batch, to=sid)
+
+def day_ticks(df):
+    """Turn one bhavcopy day into ticks: every contract's OPEN, then LOW, HIGH and CLOSE prices."""
+    df = store.restore_prices(df, ['OPEN_PRICE', 'LOW_PRICE', 'HIGH_PRICE', 'CLOSE_PRIC'])
+    contracts = df['CONTRACT_D'].astype(str).tolist()
+    ticks = []
+    for col in ('OPEN_PRICE', 'LOW_PRICE', 'HIGH_PRICE', 'CLOSE_PRIC'):
+        ticks.extend((contract, price) for contract, price in zip(contracts, df[col].tolist()) if price > 0)
+    return ticks
+
+async def replay_source(paths, batch_size=5000, rate=None, repeat=1):
+    """Local tick source: replays archived fo*.zip day files, optionally paced to `rate` ticks/sec."""
+    for _ in range(repeat):
+        for path in paths:
+            for df in read_option_files(path):
+                ticks = day_ticks(df)
+                for start in range(0, len(ticks), batch_size):
+                    yield ticks[start:start + batch_size]
+                    await asyncio.sleep(batch_size / rate if rate else 0)
+
+def seed_book(threshold, before=None):
+    """LowBook seeded from the store, using only days strictly before `before` when given."""
+    df = store.load_options(columns=['CONTRACT_D', 'LOW_PRICE', 'DATE'])
+    if before is not None and not df.empty:
+        df = df[df['DATE'] < before]
+    if df.empty:
+        return LowBook(threshold)
+    return LowBook.from_history(df, threshold)
+
+def create_app(monitor):
+    """aiohttp app serving the dashboard page and the Socket.IO endpoint."""
+    sio = socketio.AsyncServer(async_mode="aiohttp", cors_allowed_origins="*")
+    monitor.sio = sio
+    app = web.Application()
+    sio.attach(app)
+
+    async def index(request):
+        return web.FileResponse(template_path)
+
+    app.router.add_get("/", index)
+    app.router.add_post("/", index)
+
+    @sio.event
+    async def connect(sid, environ):
+        monitor.subscribe(sid)
+
+    @sio.event
+    async def disconnect(sid):
+        monitor.unsubscribe(sid)
+
+    @sio.on("subscribe")
+    async def subscribe(sid, data):
+        monitor.subscribe(sid, (data or {}).get("symbol"))
+
+    return app
+
+def benchmark(book, paths, repeat=1, clients=10):
+    """Push replayed ticks through a GainMonitor without a server; returns ticks/sec."""
+    monitor = GainMonitor(book)
+    for sid in range(clients):
+        monitor.subscribe(sid)
+    ticks = [tick for path in paths for df in read_option_files(path) for tick in day_ticks(df)]
+    on_tick = monitor.on_tick
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for contract, ltp in ticks:
+            on_tick(contract, ltp)
+    elapsed = time.perf_counter() - start
+    return monitor.ticks / elapsed, monitor.ticks, monitor.alerts
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Live options gain monitor for templates/dashboard.html.")
+    parser.add_argument("--replay", nargs="+", default=[], help="fo*.zip day files to replay as ticks")
+    parser.add_argument("--benchmark", nargs="+", default=None, help="time tick processing over these day files")
+    parser.add_argument("--repeat", type=int, default=1, help="replay/benchmark the files this many times")
+    parser.add_argument("--rate", type=float, default=None, help="replay pace in ticks/sec (default: as fast as possible)")
+    parser.add_argument("--threshold", type=float, default=default_threshold, help="gain %% that triggers an alert")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = args.benchmark or args.replay
+    before = min(trade_date(os.path.basename(path)) for path in files) if files else None
+    book = seed_book(args.threshold, before)
+
+    if args.benchmark:
+        rate, ticks, alerts = benchmark(book, args.benchmark, args.repeat)
+        print(f"{ticks} ticks, {alerts} alerts, {rate:,.0f} ticks/sec")
+        return
+
+    monitor = GainMonitor(book)
+    app = create_app(monitor)
+
+    async def start_background(app):
+        app["tasks"] = [asyncio.create_task(monitor.flush_loop())]
+        if args.replay:
+            source = replay_source(args.replay, rate=args.rate, repeat=args.repeat)
+            app["tasks"].append(asyncio.create_task(monitor.consume(source)))
+
+    async def stop_background(app):
+        for task in app["tasks"]:
+            task.cancel()
+
+    app.on_startup.append(start_background)
+    app.on_cleanup.append(stop_background)
+    web.run_app(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
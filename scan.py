@@ -0,0 +1,197 @@
+"""Headless scanner: ingest archives and run many gain scans in one pass.
+
+Example (nightly cron):
+
+    python scan.py --ingest --days 1 2 3 5 --threshold 100 500 1000 \
+        --strike-above both --output output/scan.parquet
+
+Activity scans rank the latest day instead of gains:
+
+    python scan.py --mode oi --window 5 --top 50            # OI build-up
+    python scan.py --mode volume --instrument futures       # volume vs its rolling average
+    python scan.py --mode pcr --window 5                    # put/call OI ratio per ticker and expiry
+
+Exit codes: 0 success, 1 unexpected error, 2 bad arguments, 3 no data.
+"""
+import argparse
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import store
+from activity import ActivityPanel, default_window, run_activity_scan, run_pcr_scan
+from gains import GainPanel
+from greeks import greek_columns, greek_mask
+from ingest import process_data
+from underlying import get_recent_or_1day_undrlng_st, underlying_table
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_NO_DATA = 3
+
+scan_columns = ['Option Type', 'TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE', 'LOW_PRICE', 'CLOSE_PRIC',
+                'HIGH_PRICE', 'OPEN_PRICE', 'UNDRLNG_ST', 'DATE'] + greek_columns
+result_columns = ['WINDOW', 'THRESHOLD', 'STRIKE_ABOVE_UNDRLNG', 'RANK', 'TICKER', 'EXPIRY', 'TYPE',
+                  'STRIKE PRICE', 'DISPLAY_UNDRLNG_ST', 'CLOSE_PRIC', 'LOW_PRICE', 'GAIN_PERCENT'] + greek_columns
+activity_scan_columns = ['Option Type', 'TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE', 'CLOSE_PRIC', 'OI_NO_CON',
+                         'TRADED_QUA', 'DATE']
+
+def load_scan_data(tickers=None, option_type=None):
+    """Load and clean the rows a scan needs from the store (same cleaning as the dashboard)."""
+    df = store.load_options(columns=scan_columns, tickers=tickers)
+    if df.empty:
+        return df
+    df = df.dropna(subset=['LOW_PRICE', 'HIGH_PRICE', 'CLOSE_PRIC', 'OPEN_PRICE', 'DATE'])
+    if option_type:
+        df = df[df['Option Type'] == option_type]
+    return df.reset_index(drop=True)
+
+def run_scan(df, windows=(1,), thresholds=(10,), strike_above=(False,), top=None, table=None,
+             iv_range=None, delta_range=None):
+    """Run every (window, threshold, strike_above) combination over `df` and return ranked results.
+
+    The gain panel and the underlying lookup are computed once for the whole
+    sweep; each combination is then a column lookup and a mask. Rows keep the
+    dashboard's semantics: GAIN_PERCENT >= threshold and, when strike_above is
+    set, STRIKE PRICE > DISPLAY_UNDRLNG_ST. RANK orders each scan by
+    GAIN_PERCENT (1 is the biggest gain); `top` keeps only the first N.
+    `iv_range` and `delta_range` keep contracts whose latest IV (percent)
+    and absolute DELTA fall inside the (low, high) range.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=result_columns)
+    panel = GainPanel(df, max(max(windows), 30))
+    df_undrlng = get_recent_or_1day_undrlng_st(df, table)
+    contracts = panel.contracts.assign(**panel.latest).merge(
+        df_undrlng[['TICKER', 'STRIKE PRICE', 'DISPLAY_UNDRLNG_ST']], how='left', on=['TICKER', 'STRIKE PRICE'])
+    above = ((contracts['STRIKE PRICE'] > contracts['DISPLAY_UNDRLNG_ST'])
+             & contracts['DISPLAY_UNDRLNG_ST'].notna()).to_numpy()
+    in_range = greek_mask(contracts, iv_range, delta_range)
+
+    scans = []
+    for days, threshold, strike_filter in itertools.product(windows, thresholds, strike_above):
+        gain = panel.gain_matrix[:, days - 1]
+        selected = np.flatnonzero((gain >= threshold) & (above if strike_filter else True) & in_range)
+        selected = selected[np.argsort(-gain[selected], kind='stable')]
+        if top:
+            selected = selected[:top]
+        result = contracts.iloc[selected].reset_index(drop=True)
+        result['CLOSE_PRIC'] = panel.close[selected]
+        result['LOW_PRICE'] = panel.low_matrix[selected, days - 1]
+        result['GAIN_PERCENT'] = gain[selected]
+        result['WINDOW'] = days
+        result['THRESHOLD'] = threshold
+        result['STRIKE_ABOVE_UNDRLNG'] = strike_filter
+        result['RANK'] = np.arange(1, len(selected) + 1)
+        scans.append(result[result_columns])
+    return pd.concat(scans, ignore_index=True)
+
+def activity_scan(mode, instrument="options", window=default_window, top=None, min_volume=0, tickers=None,
+                  option_type=None):
+    """Run an "oi", "volume" or "pcr" scan over the stored history; returns the ranked latest-day rows.
+
+    Returns None when the store holds no rows for the selection (an empty
+    frame means nothing passed the ranking's filters).
+    """
+    if mode == "pcr":
+        chain = store.load_chain(tickers=tickers)
+        if chain.empty:
+            return None
+        return run_pcr_scan(chain, window, top, min_volume, store.trading_dates())
+    if instrument == "futures":
+        df = store.load_futures(tickers=tickers)
+        keys = ['TICKER', 'EXPIRY']
+    else:
+        df = store.load_options(columns=activity_scan_columns, tickers=tickers)
+        if option_type and not df.empty:
+            df = df[df['Option Type'] == option_type]
+        keys = ['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE']
+    if df.empty:
+        return None
+    return run_activity_scan(ActivityPanel(df, keys, window, store.trading_dates()), mode, top, min_volume)
+
+def write_results(results, path):
+    """Write results as CSV, Parquet or JSON depending on the file extension."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith(".parquet"):
+        results.to_parquet(path, index=False)
+    elif path.endswith(".json"):
+        results.to_json(path, orient="records", date_format="iso", indent=1)
+    else:
+        results.to_csv(path, index=False)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scan ingested F&O bhavcopies for options with large gains.")
+    parser.add_argument("--mode", choices=["gain", "oi", "volume", "pcr"], default="gain",
+                        help="gain scans, or rank the latest day by OI build-up, volume spike or put/call ratio")
+    parser.add_argument("--instrument", choices=["options", "futures"], default="options",
+                        help="contracts ranked by --mode oi/volume")
+    parser.add_argument("--window", type=int, default=default_window,
+                        help="trading days for OI changes and the volume average (--mode oi/volume/pcr)")
+    parser.add_argument("--min-volume", type=float, default=0,
+                        help="minimum traded quantity (--mode oi/volume) or total open interest (--mode pcr)")
+    parser.add_argument("--ingest", action="store_true", help="ingest new archives before scanning")
+    parser.add_argument("--full", action="store_true", help="with --ingest, rebuild the store from scratch")
+    parser.add_argument("--workers", type=int, default=None, help="ingestion worker processes (default: CPU count)")
+    parser.add_argument("--days", type=int, nargs="+", default=[1], help="day windows to scan (1-30)")
+    parser.add_argument("--threshold", type=float, nargs="+", default=[10], help="minimum gain %% values")
+    parser.add_argument("--strike-above", choices=["no", "yes", "both"], default="no",
+                        help="only keep strikes above the underlying value (both runs each scan twice)")
+    parser.add_argument("--ticker", nargs="+", default=None, help="only scan these tickers")
+    parser.add_argument("--option-type", choices=["OPTSTK", "OPTIDX"], default=None)
+    parser.add_argument("--top", type=int, default=None, help="keep the top N contracts of each scan")
+    parser.add_argument("--iv-min", type=float, default=None, help="minimum implied volatility, in percent")
+    parser.add_argument("--iv-max", type=float, default=None, help="maximum implied volatility, in percent")
+    parser.add_argument("--delta-min", type=float, default=None, help="minimum absolute delta (0-1)")
+    parser.add_argument("--delta-max", type=float, default=None, help="maximum absolute delta (0-1)")
+    parser.add_argument("--output", default=os.path.join(store.destination_dir, "scan.csv"),
+                        help="result file (.csv, .parquet or .json)")
+    args = parser.parse_args(argv)
+    if any(not 1 <= days <= 30 for days in args.days):
+        parser.error("--days values must be between 1 and 30")
+    if args.window < 1:
+        parser.error("--window must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if args.ingest:
+            success, message = process_data(workers=args.workers, full=args.full)
+            print(message)
+        if args.mode != "gain":
+            results = activity_scan(args.mode, args.instrument, args.window, args.top, args.min_volume,
+                                    args.ticker, args.option_type)
+            if results is None:
+                print("No processed data found. Ingest archives first (--ingest).", file=sys.stderr)
+                return EXIT_NO_DATA
+            write_results(results, args.output)
+            print(f"{len(results)} {args.mode} result rows written to {args.output}")
+            return EXIT_OK
+        df = load_scan_data(args.ticker, args.option_type)
+        if df.empty:
+            print("No processed data found. Ingest archives first (--ingest).", file=sys.stderr)
+            return EXIT_NO_DATA
+        strike_above = {"no": [False], "yes": [True], "both": [False, True]}[args.strike_above]
+        table = underlying_table(store.load_underlying(args.ticker))
+        iv_range = None if args.iv_min is None and args.iv_max is None else (
+            args.iv_min if args.iv_min is not None else 0, args.iv_max if args.iv_max is not None else np.inf)
+        delta_range = None if args.delta_min is None and args.delta_max is None else (
+            args.delta_min if args.delta_min is not None else 0, args.delta_max if args.delta_max is not None else 1)
+        results = run_scan(df, args.days, args.threshold, strike_above, args.top, table, iv_range, delta_range)
+        write_results(results, args.output)
+        print(f"{len(results)} result rows from {len(args.days) * len(args.threshold) * len(strike_above)} "
+              f"scans written to {args.output}")
+        return EXIT_OK
+    except Exception as exc:
+        print(f"Scan failed: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+
+if __name__ == "__main__":
+    sys.exit(main())
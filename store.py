@@ -0,0 +1,272 @@
+import json
+import os
+import re
+import shutil
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from greeks import greek_columns
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Output layout: a manifest plus one Parquet partition per table and trade date
+#   output/manifest.json
+#   output/store/options/date=YYYY-MM-DD.vN/part-0.parquet
+#   output/store/underlying/date=YYYY-MM-DD.vN/part-0.parquet
+#   output/store/futures/date=YYYY-MM-DD.vN/part-0.parquet      (the fo*.csv futures rows)
+#   output/store/chain/date=YYYY-MM-DD.vN/part-0.parquet        (CE/PE OI and volume per ticker and expiry)
+# N is the data version that wrote the partition. An ingestion never touches the directories the
+# published manifest points at, so readers keep a consistent version until the new manifest replaces it.
+destination_dir = "output"
+manifest_path = os.path.join(destination_dir, "manifest.json")
+store_dir = os.path.join(destination_dir, "store")
+options_dir = os.path.join(store_dir, "options")
+tables = ["options", "underlying", "futures", "chain"]
+# Held by every ingestion (dashboard worker, scan.py, fetch.py, worker.py) so only one writes the store at a time
+lock_name = ".ingest.lock"
+generation_suffix = re.compile(r"\.v(\d+)$")
+
+# Bumped whenever the stored tables change shape; older stores are rebuilt
+store_format = 4
+
+# Typed schema of the options table
+category_columns = ["Option Type", "INSTRUMENT", "TICKER", "TYPE"]
+price_columns = ["PREVIOUS_S", "OPEN_PRICE", "HIGH_PRICE", "LOW_PRICE", "CLOSE_PRIC"]
+level_columns = ["STRIKE PRICE", "UNDRLNG_ST"]
+# Open interest, traded quantity and trade count; float64 because they overflow float32's exact integers
+volume_columns = ["OI_NO_CON", "TRADED_QUA", "TRD_NO_CON"]
+# Futures-only columns
+future_price_columns = ["SETTLEMENT", "NET_CHANGE"]
+future_level_columns = ["TRADED_VAL"]
+# Columns of the options table the dashboard (and the benchmark's load stage) reads
+dashboard_columns = ["Option Type", "TICKER", "EXPIRY", "TYPE", "STRIKE PRICE", "OPEN_PRICE", "HIGH_PRICE",
+                     "LOW_PRICE", "CLOSE_PRIC", "UNDRLNG_ST", "OI_NO_CON", "TRADED_QUA", "DATE"] + greek_columns
+
+if not os.path.exists(destination_dir):
+    os.makedirs(destination_dir)
+
+def use_directory(path):
+    """Point the store at another output directory (used by the benchmarks to work on scratch data)."""
+    global destination_dir, manifest_path, store_dir, options_dir
+    destination_dir = path
+    manifest_path = os.path.join(destination_dir, "manifest.json")
+    store_dir = os.path.join(destination_dir, "store")
+    options_dir = os.path.join(store_dir, "options")
+    os.makedirs(destination_dir, exist_ok=True)
+
+@contextmanager
+def ingest_lock():
+    """Hold the store's exclusive inter-process ingestion lock, waiting for any other ingestion to finish."""
+    os.makedirs(destination_dir, exist_ok=True)
+    with open(os.path.join(destination_dir, lock_name), "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def load_manifest():
+    """Return the saved manifest, or an empty one if nothing has been ingested yet."""
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+    return {"version": 0, "format": store_format, "archives": {}, "duplicates": []}
+
+def save_manifest(manifest):
+    """Write the manifest atomically so readers never see a half-written file."""
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def data_version():
+    """Version counter of the stored data; bumped by every ingestion that changes it."""
+    return load_manifest()["version"]
+
+def partition_name(trade_date):
+    """Partition directory name for a DD-MMM-YYYY trade date."""
+    return "date=" + pd.to_datetime(trade_date, format="%d-%b-%Y").strftime("%Y-%m-%d")
+
+def day_directory(partition, generation=None):
+    """Directory of one day's partition written for data version `generation`."""
+    return partition if generation is None else f"{partition}.v{generation}"
+
+def trading_dates():
+    """Sorted trade dates of the ingested days that hold rows, the grid activity.py lags over."""
+    dates = [entry["partition"][5:] for entry in load_manifest()["archives"].values() if entry["rows"]]
+    return pd.DatetimeIndex(pd.to_datetime(dates)).sort_values().to_numpy()
+
+def partition_exists(entry, table="options"):
+    """Whether the partition directory a manifest entry points at is on disk."""
+    return os.path.isdir(os.path.join(store_dir, table, entry.get("directory", entry["partition"])))
+
+def to_store_types(df):
+    """Cast an ingested frame to the store schema (categoricals, float32 prices, real dates).
+
+    Option premiums are float32; strikes and underlying values stay float64
+    because they are compared against each other and used as join keys,
+    and open interest and volumes stay float64 so they sum exactly.
+    """
+    df = df.copy()
+    for col in category_columns:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in price_columns + future_price_columns + greek_columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    for col in level_columns + volume_columns + future_level_columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    if "EXPIRY" in df.columns:
+        df["EXPIRY"] = pd.to_datetime(df["EXPIRY"], errors="coerce")
+    if "DATE" in df.columns:
+        df["DATE"] = pd.to_datetime(df["DATE"], format="%d-%b-%Y", errors="coerce")
+    return df.reset_index(drop=True)
+
+def write_day(frames, trade_date, table="options", generation=None):
+    """Write one trading day's frames as a new partition of `table` for data version `generation`.
+
+    Returns the number of rows written.
+    """
+    final_path = os.path.join(store_dir, table, day_directory(partition_name(trade_date), generation))
+    tmp_path = final_path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    rows = 0
+    if frames:
+        df = to_store_types(pd.concat(frames, ignore_index=True))
+        df.to_parquet(os.path.join(tmp_path, "part-0.parquet"), index=False)
+        rows = len(df)
+
+    shutil.rmtree(final_path, ignore_errors=True)
+    os.replace(tmp_path, final_path)
+    return rows
+
+def collect_garbage(*manifests):
+    """Delete every partition directory that none of `manifests` points at.
+
+    Called after publishing with the new and the previous manifest, so a
+    reader that listed files just before the switch can still read them.
+    Directories still being written (*.tmp) and those of a version newer
+    than any of `manifests` are left alone.
+    """
+    keep = {entry.get("directory", entry["partition"]) for manifest in manifests
+            for entry in manifest["archives"].values()}
+    newest = max(manifest["version"] for manifest in manifests)
+    removed = 0
+    for table in tables:
+        table_dir = os.path.join(store_dir, table)
+        if not os.path.isdir(table_dir):
+            continue
+        for name in os.listdir(table_dir):
+            generation = generation_suffix.search(name)
+            if name.endswith(".tmp") or (generation and int(generation.group(1)) > newest):
+                continue
+            if name not in keep:
+                shutil.rmtree(os.path.join(table_dir, name), ignore_errors=True)
+                removed += 1
+    return removed
+
+def partition_files(dates=None, table="options"):
+    """List the Parquet files of the ingested days, pruned to `dates`.
+
+    A store written in an older format lists nothing until it is rebuilt.
+    """
+    manifest = load_manifest()
+    if manifest.get("format") != store_format:
+        return []
+    wanted_dates = None if dates is None else {pd.Timestamp(date).strftime("%Y-%m-%d") for date in dates}
+    files = []
+    for entry in sorted(manifest["archives"].values(), key=lambda entry: entry["partition"]):
+        if not entry["rows"] or (wanted_dates is not None and entry["partition"][5:] not in wanted_dates):
+            continue
+        day_path = os.path.join(store_dir, table, entry.get("directory", entry["partition"]))
+        if not os.path.isdir(day_path):
+            continue
+        files.extend(os.path.join(day_path, name) for name in sorted(os.listdir(day_path))
+                     if name.endswith(".parquet"))
+    return files
+
+def load_options(columns=None, dates=None, tickers=None):
+    """Load the options table, reading only `columns`, the partitions of `dates` and the rows of `tickers`.
+
+    Files are memory-mapped; TICKER, EXPIRY, TYPE and Option Type come back as categoricals.
+    """
+    files = partition_files(dates)
+    if not files:
+        return pd.DataFrame(columns=columns or [])
+    filters = [("TICKER", "in", list(tickers))] if tickers is not None else None
+    table = pq.read_table(files, columns=columns, memory_map=True, filters=filters, partitioning=None)
+    df = table.to_pandas()
+    if "EXPIRY" in df.columns:
+        df["EXPIRY"] = df["EXPIRY"].astype("category")
+    for col in category_columns:
+        if col in df.columns:
+            df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    return df
+
+def load_table(table, columns=None, dates=None, tickers=None, empty_columns=None):
+    """Load one of the per-day side tables (underlying, futures, chain), pruned to `dates`/`tickers`."""
+    files = partition_files(dates, table)
+    if not files:
+        return pd.DataFrame(columns=columns or empty_columns or [])
+    filters = [("TICKER", "in", list(tickers))] if tickers is not None else None
+    return pq.read_table(files, columns=columns, memory_map=True, filters=filters, partitioning=None).to_pandas()
+
+def load_underlying(tickers=None):
+    """Load the per-ticker, per-day underlying values recorded at ingest."""
+    return load_table("underlying", tickers=tickers, empty_columns=["TICKER", "DATE", "UNDRLNG_ST"])
+
+def load_futures(columns=None, dates=None, tickers=None):
+    """Load the futures rows (fo*.csv) recorded at ingest."""
+    return load_table("futures", columns, dates, tickers,
+                      ["CONTRACT_D", "INSTRUMENT", "TICKER", "EXPIRY", "CLOSE_PRIC", "OI_NO_CON", "TRADED_QUA",
+                       "DATE"])
+
+def load_chain(columns=None, dates=None, tickers=None):
+    """Load the per ticker, expiry and day CE/PE open interest and volume of the whole option chain."""
+    return load_table("chain", columns, dates, tickers,
+                      ["TICKER", "EXPIRY", "CE_OI", "PE_OI", "CE_VOLUME", "PE_VOLUME", "DATE"])
+
+def restore_prices(df, columns):
+    """Upcast float32 price columns to float64, rounded back to the exchange's 0.01 grid.
+
+    This gives the exact values the CSV used to hold, so gain percentages
+    computed from the store match the ones computed from merge.csv.
+    """
+    df = df.copy()
+    for col in columns:
+        df[col] = df[col].astype("float64").round(2)
+    return df
+
+def export_csv(path=None):
+    """Write the whole store as a single merge.csv in the original text format."""
+    path = path or os.path.join(destination_dir, "merge.csv")
+    df = load_options()
+    if df.empty:
+        return False, "No processed data to export."
+    df = df.drop(columns=[col for col in greek_columns + volume_columns if col in df.columns])
+    df = restore_prices(df, price_columns)
+    df["DATE"] = df["DATE"].dt.strftime("%d-%b-%Y").str.upper()
+    df.to_csv(path, index=False)
+    return True, f"CSV exported to: {path}"
@@ -0,0 +1,215 @@
+"""Synthetic NSE F&O bhavcopy archives for benchmarks.
+
+Writes fo<DDMMYY>.zip files holding fo<DDMMYY>.csv (futures) and
+op<DDMMYY>.csv (options) with the exchange's column layout and CONTRACT_D
+symbol format. Underlyings follow a seeded random walk, premiums come from
+Black-Scholes and every expiry keeps its strike grid for its whole life, so
+contracts persist across days the way real ones do.
+
+    python synth.py --days 26 --tickers 220 --expiries 3 --strikes 25 --output bench/zip
+"""
+import argparse
+import io
+import os
+import string
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+option_columns = ['CONTRACT_D', 'PREVIOUS_S', 'OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'CLOSE_PRIC', 'SETTLEMENT',
+                  'NET_CHANGE', 'OI_NO_CON', 'TRADED_QUA', 'TRD_NO_CON', 'UNDRLNG_ST', 'NOTIONAL_V', 'PREMIUM_TR']
+future_columns = ['CONTRACT_D', 'PREVIOUS_S', 'OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'CLOSE_PRIC', 'SETTLEMENT',
+                  'NET_CHANGE', 'OI_NO_CON', 'TRADED_QUA', 'TRD_NO_CON', 'TRADED_VAL']
+
+# Roughly what zip/ holds today: ~220 tickers, 3 monthly expiries, ~25 strikes a side, a month of days
+default_config = {"days": 26, "tickers": 220, "expiries": 3, "strikes": 25, "start": "2025-02-03", "seed": 0}
+
+tick_size = 0.05
+lot_sizes = np.array([25, 50, 75, 100, 125, 250, 400, 500, 750, 1000, 1500, 2500])
+strike_steps = np.array([0.5, 1, 2.5, 5, 10, 20, 25, 50, 100, 250, 500])
+
+def ticker_names(count):
+    """`count` distinct letters-only tickers; about one in forty is an index."""
+    indices = max(1, count // 40) if count > 1 else 0
+    letters = string.ascii_uppercase
+    def suffix(i):
+        return letters[i // 676 % 26] + letters[i // 26 % 26] + letters[i % 26]
+    return [("IDX" if i < indices else "STK") + suffix(i) for i in range(count)], indices
+
+def monthly_expiries(start, months):
+    """Last Thursday of `months` consecutive months, starting with the month of `start`."""
+    month_ends = pd.date_range(pd.Timestamp(start).replace(day=1), periods=months, freq="ME")
+    return month_ends - pd.to_timedelta((month_ends.weekday - 3) % 7, unit="D")
+
+def round_tick(values):
+    return np.round(values / tick_size) * tick_size
+
+def norm_cdf(x):
+    """Standard normal CDF (Abramowitz-Stegun 7.1.26, error below 1.5e-7)."""
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+def option_prices(spot, strike, years, vol, call):
+    """Black-Scholes premiums with zero rates; `call` is a boolean array (False for puts)."""
+    years = np.maximum(years, 1 / 365)
+    root = vol * np.sqrt(years)
+    d1 = (np.log(spot / strike) + 0.5 * root * root) / root
+    d2 = d1 - root
+    call_price = spot * norm_cdf(d1) - strike * norm_cdf(d2)
+    return np.where(call, call_price, call_price - spot + strike)
+
+def strike_grid(spot, strikes):
+    """`strikes` strikes per spot, centred on it, spaced by a round step of about 2.5% of spot."""
+    steps = strike_steps[np.clip(np.searchsorted(strike_steps, spot * 0.025), 0, len(strike_steps) - 1)]
+    centre = np.round(spot / steps) * steps
+    grid = centre[:, None] + (np.arange(strikes) - strikes // 2) * steps[:, None]
+    return np.where(grid > 0, grid, np.nan)
+
+def format_strike(strike):
+    return f"{strike:g}"
+
+def write_archive(path, trade_date, futures, options):
+    """Write one day's futures and options frames as a fo<DDMMYY>.zip archive."""
+    stamp = trade_date.strftime("%d%m%y")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, df in ((f"fo{stamp}.csv", futures), (f"op{stamp}.csv", options)):
+            buffer = io.BytesIO()
+            table = pa.Table.from_pandas(df.round(2), preserve_index=False)
+            pv.write_csv(table, buffer, pv.WriteOptions(quoting_style="none", quoting_header="none"))
+            archive.writestr(name, buffer.getvalue())
+
+def generate(output_dir, days=26, tickers=220, expiries=3, strikes=25, start="2025-02-03", seed=0):
+    """Write `days` consecutive weekday archives into `output_dir` and return their paths.
+
+    Each day lists `tickers` underlyings x `expiries` monthly expiries x
+    `strikes` strikes x CE/PE. About two thirds of the rows are untraded
+    (zero OPEN/HIGH/LOW and an empty CLOSE), like the real files.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    names, indices = ticker_names(tickers)
+    names = np.array(names)
+    kinds = np.where(np.arange(tickers) < indices, "IDX", "STK")
+    spot = np.exp(rng.uniform(np.log(50), np.log(20000), tickers))
+    vol = rng.uniform(0.15, 0.6, tickers)
+    lots = rng.choice(lot_sizes, tickers)
+    dates = pd.bdate_range(start, periods=days)
+    calendar = monthly_expiries(dates[0], (dates[-1].year - dates[0].year) * 12 + dates[-1].month
+                                - dates[0].month + expiries + 1)
+
+    grids = {}
+    previous = pd.DataFrame(columns=['SETTLEMENT', 'OI_NO_CON'], dtype="float64")
+    previous_futures = pd.Series(dtype="float64")
+    paths = []
+    for date in dates:
+        # Underlying random walk with occasional jumps, which is what produces large option gains
+        returns = rng.normal(0, vol / np.sqrt(252)) + np.where(rng.random(tickers) < 0.01,
+                                                               rng.normal(0, 0.08, tickers), 0)
+        spot = spot * np.exp(returns)
+        underlying = round_tick(spot)
+
+        active = calendar[calendar >= date][:expiries]
+        for expiry in active:
+            if expiry not in grids:
+                grids[expiry] = strike_grid(spot, strikes)
+        grid = np.stack([grids[expiry] for expiry in active], axis=1)
+
+        # One row per ticker x expiry x strike x CE/PE
+        shape = grid.shape + (2,)
+        ticker_idx = np.broadcast_to(np.arange(tickers)[:, None, None, None], shape).ravel()
+        expiry_idx = np.broadcast_to(np.arange(len(active))[None, :, None, None], shape).ravel()
+        strike = np.broadcast_to(grid[..., None], shape).ravel()
+        call = np.broadcast_to(np.array([True, False]), shape).ravel()
+        keep = ~np.isnan(strike)
+        ticker_idx, expiry_idx, strike, call = ticker_idx[keep], expiry_idx[keep], strike[keep], call[keep]
+        rows = len(strike)
+
+        expiry_text = pd.DatetimeIndex(active).strftime("%d-%b-%Y").str.upper().to_numpy()
+        contracts = ("OPT" + kinds[ticker_idx] + names[ticker_idx] + expiry_text[expiry_idx]
+                     + np.where(call, "CE", "PE") + np.array([format_strike(value) for value in strike]))
+        years = (active[expiry_idx] - date).days.to_numpy() / 365
+        settlement = np.maximum(round_tick(option_prices(spot[ticker_idx], strike, years, vol[ticker_idx], call)),
+                                tick_size)
+
+        # Near-the-money strikes trade far more often than far ones
+        moneyness = np.log(strike / spot[ticker_idx])
+        traded = rng.random(rows) < 0.2 + 0.6 * np.exp(-(moneyness / 0.08) ** 2)
+        close = settlement * np.exp(rng.normal(0, 0.03, rows))
+        open_ = close * np.exp(rng.normal(0, 0.15, rows))
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.1, rows)))
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.2, rows)))
+        prices = {name: np.where(traded, np.maximum(round_tick(values), tick_size), 0.0)
+                  for name, values in (("OPEN_PRICE", open_), ("HIGH_PRICE", high), ("LOW_PRICE", low),
+                                       ("CLOSE_PRIC", close))}
+        prices["CLOSE_PRIC"] = np.where(traded, prices["CLOSE_PRIC"], np.nan)
+
+        trades = np.where(traded, rng.geometric(0.05, rows), 0)
+        quantity = trades * rng.integers(1, 4, rows) * lots[ticker_idx]
+        prior = previous.reindex(contracts)
+        oi = np.maximum(prior['OI_NO_CON'].fillna(0).to_numpy() + quantity * rng.uniform(-0.5, 1, rows), 0)
+        options = pd.DataFrame({
+            'CONTRACT_D': contracts,
+            'PREVIOUS_S': prior['SETTLEMENT'].to_numpy(),
+            **{name: prices[name] for name in ('OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'CLOSE_PRIC')},
+            'SETTLEMENT': settlement,
+            'NET_CHANGE': settlement - prior['SETTLEMENT'].to_numpy(),
+            'OI_NO_CON': np.round(oi),
+            'TRADED_QUA': quantity.astype("float64"),
+            'TRD_NO_CON': trades.astype("float64"),
+            'UNDRLNG_ST': underlying[ticker_idx],
+            'NOTIONAL_V': quantity * (strike + np.nan_to_num(prices["CLOSE_PRIC"])),
+            'PREMIUM_TR': quantity * np.nan_to_num(prices["CLOSE_PRIC"]),
+        }, columns=option_columns)
+        previous = pd.DataFrame({'SETTLEMENT': settlement, 'OI_NO_CON': oi}, index=contracts)
+
+        # One future per ticker and expiry, priced at a small carry over spot
+        future_ticker = np.repeat(np.arange(tickers), len(active))
+        future_expiry = np.tile(np.arange(len(active)), tickers)
+        future_contracts = "FUT" + kinds[future_ticker] + names[future_ticker] + expiry_text[future_expiry]
+        carry = 1 + 0.07 * (active[future_expiry] - date).days.to_numpy() / 365
+        future_close = round_tick(spot[future_ticker] * carry)
+        future_quantity = (rng.geometric(0.002, len(future_ticker)) * lots[future_ticker]).astype("float64")
+        future_previous = previous_futures.reindex(future_contracts).to_numpy()
+        future_open = round_tick(future_close * np.exp(rng.normal(0, 0.005, len(future_ticker))))
+        futures = pd.DataFrame({
+            'CONTRACT_D': future_contracts,
+            'PREVIOUS_S': future_previous,
+            'OPEN_PRICE': future_open,
+            'HIGH_PRICE': round_tick(np.maximum(future_open, future_close) * 1.005),
+            'LOW_PRICE': round_tick(np.minimum(future_open, future_close) * 0.995),
+            'CLOSE_PRIC': future_close,
+            'SETTLEMENT': future_close,
+            'NET_CHANGE': (future_close - future_previous) / future_previous * 100,
+            'OI_NO_CON': future_quantity * 5,
+            'TRADED_QUA': future_quantity,
+            'TRD_NO_CON': np.ceil(future_quantity / lots[future_ticker]),
+            'TRADED_VAL': future_quantity * future_close,
+        }, columns=future_columns)
+        previous_futures = pd.Series(future_close, index=future_contracts)
+
+        path = os.path.join(output_dir, f"fo{date.strftime('%d%m%y')}.zip")
+        write_archive(path, date, futures, options)
+        paths.append(path)
+    return paths
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic fo<DDMMYY>.zip bhavcopy archives.")
+    parser.add_argument("--output", default=os.path.join("bench", "zip"), help="directory for the archives")
+    for name, value in default_config.items():
+        parser.add_argument(f"--{name}", type=type(value), default=value)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = {name: getattr(args, name) for name in default_config}
+    paths = generate(args.output, **config)
+    print(f"{len(paths)} archives written to {args.output}")
+
+if __name__ == "__main__":
+    main()
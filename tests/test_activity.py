@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from activity import ActivityPanel, pcr_table
+
+keys = ['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE']
+calendar = pd.bdate_range("2025-03-03", periods=8).to_numpy()
+
+def contract_rows(ticker, days, oi, volume, close):
+    """Rows of one contract on the given calendar positions."""
+    return pd.DataFrame({'TICKER': ticker, 'EXPIRY': pd.Timestamp("2025-03-27"), 'TYPE': "CE", 'STRIKE PRICE': 100.0,
+                         'DATE': calendar[days], 'OI_NO_CON': oi, 'TRADED_QUA': volume,
+                         'CLOSE_PRIC': np.asarray(close, dtype="float32")})
+
+def gappy_history():
+    """ACC trades every day; ZEEL drops out on days 2, 3 and 5 (e.g. its strike fell below the underlying)."""
+    return pd.concat([contract_rows("ACC", range(8), np.arange(8) * 10.0, np.full(8, 100.0), np.full(8, 5.0)),
+                      contract_rows("ZEEL", [0, 1, 4, 6, 7], [100.0, 110.0, 140.0, 160.0, 170.0],
+                                    [10.0, 20.0, 50.0, 70.0, 80.0], [1.0, 2.0, 4.0, 5.0, 8.0])],
+                     ignore_index=True)
+
+def zeel(series):
+    return series[series['TICKER'] == "ZEEL"].reset_index(drop=True)
+
+def test_lags_follow_trading_days_not_rows():
+    series = zeel(ActivityPanel(gappy_history(), keys, window=2, calendar=calendar).series())
+    # Two trading days back from days 0, 1, 4, 6 and 7 are -2, -1, 2 (missing), 4 and 5 (missing)
+    np.testing.assert_array_equal(series['OI_CHANGE'], [np.nan, np.nan, np.nan, 20.0, np.nan])
+    np.testing.assert_allclose(series['PRICE_CHANGE_PCT'], [np.nan, np.nan, np.nan, 25.0, np.nan])
+    # Mean of the volumes recorded over the previous two trading days
+    np.testing.assert_array_equal(series['VOLUME_AVG'], [np.nan, 10.0, np.nan, 50.0, 70.0])
+    assert list(series['BUILDUP']) == ["", "", "", "Long build-up", ""]
+
+def test_filtered_selection_keeps_the_store_grid():
+    df = gappy_history()
+    full = zeel(ActivityPanel(df, keys, window=2, calendar=calendar).series())
+    alone = ActivityPanel(df[df['TICKER'] == "ZEEL"], keys, window=2, calendar=calendar).series()
+    pd.testing.assert_frame_equal(alone, full)
+    # Without the calendar a lone contract only sees its own dates, so lags count rows
+    rows = ActivityPanel(df[df['TICKER'] == "ZEEL"], keys, window=2).series()
+    assert rows['OI_CHANGE'].iloc[2] == 40.0
+
+def test_pcr_change_uses_the_calendar():
+    chain = pd.DataFrame({'TICKER': "ACC", 'EXPIRY': pd.Timestamp("2025-03-27"), 'DATE': calendar[[0, 1, 3]],
+                          'CE_OI': [100.0, 100.0, 100.0], 'PE_OI': [50.0, 80.0, 120.0],
+                          'CE_VOLUME': [10.0, 10.0, 10.0], 'PE_VOLUME': [5.0, 5.0, 5.0]})
+    assert np.isnan(pcr_table(chain, window=1, calendar=calendar)['PCR_OI_CHANGE'].iloc[0])
+    assert pcr_table(chain, window=2, calendar=calendar)['PCR_OI_CHANGE'].iloc[0] == pytest.approx(0.4)
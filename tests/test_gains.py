@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import store
+from gains import GainPanel, calculate_daywise_gain
+
+def looped_daywise_gain(df, days):
+    """The per-group loop calculate_daywise_gain replaced, kept as the reference result."""
+    df_sorted = store.restore_prices(df, ['LOW_PRICE', 'CLOSE_PRIC']).sort_values(['TICKER', 'EXPIRY', 'STRIKE PRICE', 'DATE'])
+    gain_data = []
+    for (ticker, expiry, type_, strike), group in df_sorted.groupby(['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE'], observed=True):
+        if len(group) >= days:
+            low_price = group.iloc[-days]['LOW_PRICE']
+        else:
+            low_price = group['LOW_PRICE'].iloc[0]
+        close_price = group['CLOSE_PRIC'].iloc[-1]
+        gain_percent = int(((close_price - low_price) / low_price) * 100) if low_price != 0 else 0
+        gain_data.append({
+            'TICKER': ticker,
+            'EXPIRY': expiry,
+            'TYPE': type_,
+            'STRIKE PRICE': strike,
+            'CLOSE_PRIC': close_price,
+            'LOW_PRICE': low_price,
+            'GAIN_PERCENT': gain_percent
+        })
+    return pd.DataFrame(gain_data)
+
+def option_history(seed=0, days=12):
+    """Random option rows on the store's types: uneven histories, shuffled rows and some zero lows."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2025-02-03", periods=days)
+    rows = []
+    for ticker in ["ACC", "NIFTY", "ZEEL"]:
+        for expiry in pd.to_datetime(["2025-02-27", "2025-03-27"]):
+            for type_ in ["CE", "PE"]:
+                for strike in [100.0, 102.5, 110.0]:
+                    for date in dates[rng.integers(0, days):]:
+                        rows.append((ticker, expiry, type_, strike, date))
+    df = pd.DataFrame(rows, columns=['TICKER', 'EXPIRY', 'TYPE', 'STRIKE PRICE', 'DATE'])
+    df['LOW_PRICE'] = np.round(rng.uniform(0.05, 50, len(df)), 2).astype('float32')
+    df.loc[rng.random(len(df)) < 0.05, 'LOW_PRICE'] = 0
+    df['CLOSE_PRIC'] = np.round(rng.uniform(0.05, 80, len(df)), 2).astype('float32')
+    for col in ['TICKER', 'TYPE']:
+        df[col] = df[col].astype('category')
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+@pytest.mark.parametrize("days", [1, 3, 7, 30])
+def test_panel_matches_per_group_loop(days):
+    df = option_history()
+    expected = looped_daywise_gain(df, days)
+    result = calculate_daywise_gain(df, days)[expected.columns]
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected, check_dtype=False,
+                                  check_categorical=False)
+
+def test_gains_rejects_windows_outside_panel():
+    panel = GainPanel(option_history(), window=5)
+    with pytest.raises(ValueError):
+        panel.gains(6)
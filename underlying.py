@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+def underlying_table(underlying):
+    """Pivot (TICKER, DATE, UNDRLNG_ST) rows into a ticker x date table, forward-filled across missing days."""
+    table = underlying.pivot_table(index="TICKER", columns="DATE", values="UNDRLNG_ST",
+                                   aggfunc="first", observed=True)
+    return table.sort_index().sort_index(axis=1).ffill(axis=1)
+
+# Function to Get the Most Recent or 1-Day Old `UNDRLNG_ST`
+def get_recent_or_1day_undrlng_st(df, table=None):
+    """Get most recent or 1-day-old `UNDRLNG_ST` for each strike price per ticker.
+
+    The most recent value is the ticker's underlying on the last DATE the
+    (TICKER, STRIKE PRICE) pair has rows; the fallback is the ticker's value
+    on the trading day before. Both come from `table` (see underlying_table),
+    built from `df` itself when not given, with one vectorized lookup.
+    """
+    if table is None:
+        table = underlying_table(df[["TICKER", "DATE", "UNDRLNG_ST"]])
+    latest = df.groupby(["TICKER", "STRIKE PRICE"], observed=True)["DATE"].max().reset_index()
+
+    values = table.to_numpy(dtype="float64")
+    ticker_idx = table.index.astype(str).get_indexer(latest["TICKER"].astype(str))
+    date_idx = table.columns.searchsorted(latest["DATE"].to_numpy(), side="right") - 1
+    found = (ticker_idx >= 0) & (date_idx >= 0)
+
+    recent = np.full(len(latest), np.nan)
+    fallback = np.full(len(latest), np.nan)
+    recent[found] = values[ticker_idx[found], date_idx[found]]
+    has_previous = found & (date_idx >= 1)
+    fallback[has_previous] = values[ticker_idx[has_previous], date_idx[has_previous] - 1]
+    fallback = np.where(np.isnan(fallback), recent, fallback)
+
+    return pd.DataFrame({
+        'TICKER': latest['TICKER'],
+        'STRIKE PRICE': latest['STRIKE PRICE'],
+        'MOST_RECENT_UNDRLNG_ST': recent,
+        'FALLBACK_1DAY_UNDRLNG_ST': fallback,
+        'DISPLAY_UNDRLNG_ST': np.where(np.isnan(recent), fallback, recent)
+    })
@@ -0,0 +1,203 @@
+"""Background ingestion worker.
+
+Polls zip/ (and ZIPBK/) for new, changed or removed archives and the
+uploads/ drop area for files saved by the dashboard, and runs
+process_data off the request thread. A new data version becomes visible
+only when process_data publishes its manifest, so dashboard sessions keep
+serving the previous version until then. Progress and queue depth are
+available from `status()`.
+
+    python worker.py                  # run standalone (e.g. next to `python fetch.py`)
+    python worker.py --once           # ingest whatever is queued and exit
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import store
+from diagnostics import Trace
+from fetch import quarantine, quarantine_dir, validate_archive
+from ingest import backup_dir, extract_date, item_stat, list_items, process_data, source_dir
+
+upload_dir = "uploads"
+default_poll_interval = 2.0
+
+def save_upload(name, data, directory=upload_dir):
+    """Drop an uploaded archive into `directory` for the worker (written through a .part file)."""
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, name + ".part")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, os.path.join(directory, name))
+
+def collect_uploads(directory=upload_dir, destination=source_dir, quarantine_to=quarantine_dir):
+    """Move finished uploads into `destination`, quarantining invalid ones; returns the names moved."""
+    if not os.path.isdir(directory):
+        return []
+    moved = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith(".part") or not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        reason = validate_archive(data)
+        if reason is not None:
+            quarantine(name, data, reason, quarantine_to)
+            os.remove(path)
+            continue
+        os.makedirs(destination, exist_ok=True)
+        os.replace(path, os.path.join(destination, name))
+        moved.append(name)
+    return moved
+
+def pending_days(source_dirs, manifest=None):
+    """Trade dates whose archive is new, changed (size or mtime) or gone since the last ingestion.
+
+    Only stats files, so it is cheap enough to call on every poll; process_data
+    then decides by content hash. Days whose partitions are missing count as
+    changed, and every day does when the store was written in an older format.
+    An archive the last run failed to read is not pending until it changes.
+    """
+    manifest = manifest or store.load_manifest()
+    current = manifest.get("format") == store.store_format
+    ingested = {entry["trade_date"]: entry for entry in manifest["archives"].values()
+                if current and all(store.partition_exists(entry, table) for table in store.tables)}
+    failed = manifest.get("failed", {}) if current else {}
+    seen, pending = set(), []
+    for directory in source_dirs:
+        if not os.path.isdir(directory):
+            continue
+        for item_path in list_items(directory):
+            formatted_date = extract_date(os.path.basename(item_path).split(".")[0])
+            if not formatted_date or formatted_date in seen:
+                continue
+            seen.add(formatted_date)
+            stat = item_stat(item_path)
+            known = [entry for entry in (ingested.get(formatted_date), failed.get(formatted_date)) if entry]
+            if not any(entry["path"] == item_path and (entry["size"], entry.get("mtime_ns")) == stat
+                       for entry in known):
+                pending.append(formatted_date)
+    gone = {entry["trade_date"] for entry in (*manifest["archives"].values(), *failed.values())} - seen
+    return pending + sorted(gone)
+
+class IngestWorker:
+    """Thread that keeps the store up to date with the archive directories.
+
+    Every `poll_interval` seconds (or at once after `request()`), uploads
+    are moved into zip/ and process_data runs if any day is pending.
+    `status()` returns a snapshot: state ("idle", "ingesting", "stopped"),
+    queue depth, done/total archives of the current run, the published
+    data version, the archives that could not be read and the last run's
+    message, error and stage timings.
+    """
+
+    def __init__(self, source_dirs=None, uploads=upload_dir, poll_interval=default_poll_interval, workers=None):
+        self.source_dirs = source_dirs or [source_dir, backup_dir]
+        self.uploads = uploads
+        self.poll_interval = poll_interval
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.state = {"state": "stopped", "queue": 0, "done": 0, "total": 0, "version": store.data_version(),
+                      "failed": [], "message": None, "error": None, "finished": None, "seconds": None,
+                      "trace": None}
+
+    def start(self):
+        """Start the polling thread (a daemon, so it never blocks interpreter exit)."""
+        if self.thread is None or not self.thread.is_alive():
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self.run, name="ingest-worker", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self.stopping.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def request(self):
+        """Poll now instead of waiting for the next interval."""
+        self.wake.set()
+
+    def status(self):
+        with self.lock:
+            return dict(self.state)
+
+    def update(self, **values):
+        with self.lock:
+            self.state.update(values)
+
+    def poll(self):
+        """Move uploads in, then ingest if anything is pending; returns True when a run happened."""
+        collect_uploads(self.uploads, self.source_dirs[0])
+        queue = len(pending_days(self.source_dirs))
+        # Other writers (scan.py, fetch.py, worker.py) publish versions too
+        manifest = store.load_manifest()
+        self.update(queue=queue, version=manifest["version"],
+                    failed=[entry["name"] for entry in manifest.get("failed", {}).values()])
+        if not queue:
+            return False
+        self.update(state="ingesting", done=0, total=queue, error=None)
+        start = time.perf_counter()
+        trace = Trace("worker")
+        try:
+            success, message = process_data(workers=self.workers, source_dirs=self.source_dirs, trace=trace,
+                                             progress=lambda done, total: self.update(done=done, total=total))
+            self.update(message=message, error=None if success else message)
+        except Exception as exc:
+            self.update(error=f"{type(exc).__name__}: {exc}")
+        manifest = store.load_manifest()
+        self.update(state="idle", queue=len(pending_days(self.source_dirs, manifest)), version=manifest["version"],
+                    failed=[entry["name"] for entry in manifest.get("failed", {}).values()],
+                    finished=time.time(), seconds=time.perf_counter() - start, trace=trace.summary())
+        return True
+
+    def run(self):
+        self.update(state="idle")
+        while not self.stopping.is_set():
+            try:
+                self.poll()
+            except Exception as exc:
+                self.update(state="idle", error=f"{type(exc).__name__}: {exc}")
+            self.wake.wait(self.poll_interval)
+            self.wake.clear()
+        self.update(state="stopped")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest archives from zip/ and uploads/ as they arrive.")
+    parser.add_argument("--interval", type=float, default=default_poll_interval, help="seconds between polls")
+    parser.add_argument("--workers", type=int, default=None, help="ingestion worker processes (default: CPU count)")
+    parser.add_argument("--once", action="store_true", help="ingest what is pending and exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    worker = IngestWorker(poll_interval=args.interval, workers=args.workers)
+    if args.once:
+        worker.poll()
+        status = worker.status()
+        print(status["error"] or status["message"] or "Nothing to ingest.")
+        return 1 if status["error"] else 0
+    worker.start()
+    last = None
+    try:
+        while True:
+            time.sleep(args.interval)
+            status = worker.status()
+            line = (f"{status['state']}: {status['done']}/{status['total']} archives, queue {status['queue']}, "
+                    f"version {status['version']}")
+            if line != last:
+                print(line + (f" ({status['error'] or status['message']})" if status["finished"] else ""))
+                last = line
+    except KeyboardInterrupt:
+        worker.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())